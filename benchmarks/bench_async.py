@@ -0,0 +1,72 @@
+"""
+Latency of the event loop while many configs are validated concurrently,
+validating on the loop compared to the async methods.
+
+    python -m benchmarks.bench_async
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+
+from typeconf import TypeFactory
+from .synthetic import generate_nested, example_config
+
+
+async def heartbeat(stop, interval=0.001):
+    """Returns how late the loop woke up a sleeping task, in seconds"""
+    delays = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        delays.append(time.perf_counter() - start - interval)
+    return delays
+
+
+async def load(template, cfg, clients, requests, blocking):
+    async def client():
+        for _ in range(requests):
+            if blocking:
+                template.validate(cfg)
+                await asyncio.sleep(0)
+            else:
+                await template.avalidate(cfg)
+
+    stop = asyncio.Event()
+    beat = asyncio.ensure_future(heartbeat(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(clients)])
+    seconds = time.perf_counter() - start
+    stop.set()
+    return seconds, await beat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--attributes', type=int, default=50)
+    parser.add_argument('--references', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=10)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as root:
+        name = generate_nested(root, args.depth, args.attributes, args.references)
+        factory = TypeFactory(root)
+    template = factory.build_template(name)
+    cfg = example_config(factory.schema(name))
+    template.compile()
+
+    for clients in (1, 10, 50):
+        for blocking in (True, False):
+            seconds, delays = asyncio.run(load(template, cfg, clients, args.requests, blocking))
+            delays.sort()
+            print("{:3d} clients {:8s} {:7.3f}s, loop delay median {:7.2f} ms, p99 {:7.2f} ms, max {:7.2f} ms".format(
+                clients, "blocking" if blocking else "async", seconds,
+                statistics.median(delays) * 1e3, delays[int(len(delays) * 0.99)] * 1e3, delays[-1] * 1e3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Time of TypeFactory.build_template on deep and wide templates.
+
+    python -m benchmarks.bench_build_template
+"""
+import argparse
+import tempfile
+import time
+
+from typeconf import TypeFactory
+from .synthetic import generate_nested
+
+SHAPES = {
+    # name: (depth, attributes, references)
+    'deep': (8, 10, 2),
+    'wide': (2, 2000, 50),
+}
+
+
+def measure(root, name, repeat):
+    factory = TypeFactory(root)
+    start = time.perf_counter()
+    factory.build_template(name)
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        factory.build_template(name)
+    return first, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    for shape, (depth, attributes, references) in SHAPES.items():
+        with tempfile.TemporaryDirectory() as root:
+            name = generate_nested(root, depth, attributes, references)
+            first, again = measure(root, name, args.repeat)
+            print("{:5s} depth {} attributes {} references {}: first {:9.6f}s, then {:9.6f}s".format(
+                shape, depth, attributes, references, first, again))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Compares cold and warm startup with the persistent template cache.
+
+    python -m benchmarks.bench_cache --files 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from typeconf import TypeFactory
+from .synthetic import generate_repository
+
+
+def startup(root, name, cache):
+    start = time.perf_counter()
+    factory = TypeFactory(root, cache=cache)
+    factory.build_template(name)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--attributes', type=int, default=10)
+    parser.add_argument('--references', type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        templates = os.path.join(root, "templates")
+        cache = os.path.join(root, "cache")
+        name = generate_repository(templates, files=args.files, attributes=args.attributes,
+                                   references=args.references)
+        print("{} templates, building {}".format(args.files, name))
+        print("no cache {:8.3f}s".format(startup(templates, name, None)))
+        print("cold     {:8.3f}s".format(startup(templates, name, cache)))
+        print("warm     {:8.3f}s".format(startup(templates, name, cache)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+DependencyGraph.get_dep_order on synthetic graphs with heavy diamond sharing.
+
+    python -m benchmarks.bench_dep_graph --nodes 10000
+"""
+import argparse
+import random
+import time
+
+from typeconf.dep_graph import DependencyGraph
+
+
+def layered_graph(nodes, width, fan_out, seed=0):
+    """Every node depends on fan_out nodes of the layer below"""
+    rng = random.Random(seed)
+    graph = DependencyGraph()
+    layers = [[]]
+    for idx in range(nodes):
+        if len(layers[-1]) == width:
+            layers.append([])
+        below = layers[-2] if len(layers) > 1 else []
+        deps = set(rng.sample(below, min(fan_out, len(below))))
+        name = "n{}".format(idx)
+        graph.add(name, dependency_list=deps)
+        layers[-1].append(name)
+    return graph, layers
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def resolve_all(graph, names):
+    for name in names:
+        graph.get_dep_order(name)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--nodes', type=int, default=10000)
+    parser.add_argument('--width', type=int, default=100)
+    parser.add_argument('--fan-out', type=int, default=10)
+    args = parser.parse_args()
+
+    graph, layers = layered_graph(args.nodes, args.width, args.fan_out)
+    print("{} nodes in {} layers, {} dependencies each".format(args.nodes, len(layers), args.fan_out))
+    print("first top level node  {:9.6f}s".format(timed(graph.get_dep_order, layers[-1][0])))
+    print("all top level nodes   {:9.6f}s".format(timed(resolve_all, graph, layers[-1])))
+    print("all nodes             {:9.6f}s".format(timed(resolve_all, graph, sum(layers, []))))
+    print("all nodes, cached     {:9.6f}s".format(timed(resolve_all, graph, sum(layers, []))))
+    middle = layers[len(layers) // 2][0]
+    graph.add_node(graph.get_node(middle))
+    print("replaced {}, {} orders left".format(middle, len(graph.orders)))
+    print("all nodes, after      {:9.6f}s".format(timed(resolve_all, graph, sum(layers, []))))
+
+    chain = DependencyGraph()
+    for idx in range(args.nodes):
+        chain.add(str(idx), dependency_list={str(idx - 1)} if idx > 0 else set())
+    print("chain of {} nodes     {:9.6f}s".format(args.nodes, timed(chain.get_dep_order, str(args.nodes - 1))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Template discovery and loading on a tree with thousands of files.
+
+    python -m benchmarks.bench_discovery --files 5000 --workers 8
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from typeconf import utils as u
+from typeconf import TypeFactory
+from .synthetic import generate_repository
+
+
+def listdir_discover(basepath):
+    """discovery with a separate stat call per entry, as before os.scandir"""
+    for f in os.listdir(basepath):
+        path = os.path.join(basepath, f)
+        if os.path.isdir(path):
+            yield from listdir_discover(path)
+        elif os.path.isfile(path) and f.endswith('.yaml'):
+            yield path
+
+
+def read_pure_python(path):
+    import yaml
+    with open(path, 'r') as f:
+        return yaml.load(f, yaml.SafeLoader)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        generate_repository(root, files=args.files, folders=50)
+        paths = [p for p, _, type_enum in u.discover(root) if type_enum == u.FILE_ENUM]
+        print("{} files, {} workers, libyaml {}".format(
+            len(paths), args.workers, u.yaml_loader().__name__ == 'CSafeLoader'))
+
+        print("discover listdir      {:8.3f}s".format(timed(lambda: list(listdir_discover(root)))))
+        print("discover scandir      {:8.3f}s".format(timed(lambda: list(u.discover(root)))))
+        print("read SafeLoader       {:8.3f}s".format(timed(lambda: [read_pure_python(p) for p in paths])))
+        print("read sequential       {:8.3f}s".format(timed(u.read_files, paths)))
+        print("read threads          {:8.3f}s".format(timed(u.read_files, paths, args.workers)))
+        print("read processes        {:8.3f}s".format(timed(u.read_files, paths, args.workers, True)))
+        print("register sequential   {:8.3f}s".format(timed(TypeFactory, root)))
+        print("register threads      {:8.3f}s".format(timed(TypeFactory, root, workers=args.workers)))
+
+
+if __name__ == "__main__":
+    main()
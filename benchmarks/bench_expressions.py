@@ -0,0 +1,45 @@
+"""
+Compiled expressions of eval attributes compared to the builtin eval of the source.
+
+    python -m benchmarks.bench_expressions
+"""
+import argparse
+import logging
+import os
+import tempfile
+import timeit
+
+from typeconf import TypeFactory
+from typeconf.expression import evaluate
+from .synthetic import attribute, write_template
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=100000)
+    parser.add_argument('--expressions', type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    source = "width * 4 + max(depth, 2) - 1"
+    scope = {'width': 8, 'depth': 3}
+    for name, fn in (("eval", lambda: eval(source, None, scope)),
+                     ("compiled", lambda: evaluate(source, scope))):
+        seconds = timeit.timeit(fn, number=args.number)
+        print("{:9s} {:8.1f} ns per expression".format(name, seconds / args.number * 1e9))
+
+    with tempfile.TemporaryDirectory() as root:
+        cfg = {'width': attribute('int', default=8), 'depth': attribute('int', default=3)}
+        for e in range(args.expressions):
+            cfg["expr{}".format(e)] = dict(attribute('int', default=source), eval=True)
+        write_template(os.path.join(root, "model.yaml"), cfg)
+        factory = TypeFactory(root)
+    template = factory.build_template('model')
+    cfgs = [{'width': w} for w in range(args.number // args.expressions)]
+    seconds = timeit.timeit(lambda: template.validate_many(cfgs), number=1)
+    print("validate  {:8.1f} us per config with {} expressions".format(
+        seconds / len(cfgs) * 1e6, args.expressions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Hashing a resolved config with json.dumps(sort_keys=True), with fingerprint
+on the whole config and with the cached digests of the template after
+changing a few leaves. Also times diff of two configs differing in one leaf.
+
+    python -m benchmarks.bench_fingerprint
+"""
+import argparse
+import hashlib
+import json
+import logging
+import random
+import tempfile
+import time
+
+from typeconf import TypeFactory
+from typeconf import fingerprint
+from .synthetic import generate_nested, example_config
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--attributes', type=int, default=50)
+    parser.add_argument('--references', type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as root:
+        name = generate_nested(root, args.depth, args.attributes, args.references)
+        factory = TypeFactory(root)
+    template = factory.build_template(name)
+    template.fill_from_cfg(example_config(factory.schema(name)))
+    leaves = [path for path in template.index.paths if path.split('.')[-1].startswith('attr')]
+    config = template.to_config()
+
+    _, seconds = timed(lambda: hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest())
+    print("{} leaves, json.dumps     {:9.6f}s".format(len(leaves), seconds))
+    _, seconds = timed(lambda: fingerprint.hexdigest(config))
+    print("{} leaves, hexdigest      {:9.6f}s".format(len(leaves), seconds))
+    _, seconds = timed(template.fingerprint)
+    print("{} leaves, first template {:9.6f}s".format(len(leaves), seconds))
+
+    rng = random.Random(0)
+    for changes in (1, 10, 100, 1000):
+        template.update({path: "2" for path in rng.sample(leaves, min(changes, len(leaves)))})
+        _, seconds = timed(template.fingerprint)
+        print("{:6d} changed leaves       {:9.6f}s".format(changes, seconds))
+
+    old = template.to_config(frozen=True)
+    _, seconds = timed(lambda: fingerprint.digest(old))
+    print("digest of a frozen config  {:9.6f}s".format(seconds))
+    template.update({rng.choice(leaves): "3"})
+    # shares the unchanged subtrees and their digests with old
+    new = template.to_config(frozen=True)
+    _, seconds = timed(lambda: fingerprint.digest(new))
+    print("after one change           {:9.6f}s".format(seconds))
+    changes, seconds = timed(lambda: fingerprint.diff(old, new))
+    print("diff of frozen configs     {:9.6f}s, {} changes".format(seconds, len(changes)))
+    old, new = old._asdict(), new._asdict()
+    changes, seconds = timed(lambda: fingerprint.diff(old, new))
+    print("diff of dicts              {:9.6f}s, {} changes".format(seconds, len(changes)))
+
+
+if __name__ == "__main__":
+    main()
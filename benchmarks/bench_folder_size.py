@@ -0,0 +1,69 @@
+"""
+Time and peak memory of building a template whose folder has many subtypes,
+only the chosen one is read and built.
+
+    python -m benchmarks.bench_folder_size --sizes 10 100 1000
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+from typeconf import TypeFactory
+from .synthetic import attribute, write_template
+
+
+def generate_folder(root, variants, attributes=10):
+    """Writes a root template with one attribute choosing from a folder of `variants` templates"""
+    folder = os.path.join(root, "variants")
+    os.makedirs(folder)
+    for idx in range(variants):
+        cfg = {"attr{}".format(a): attribute('int') for a in range(attributes)}
+        write_template(os.path.join(folder, "v{}.yaml".format(idx)), cfg)
+    write_template(os.path.join(root, "root.yaml"), {'choice': attribute('variants', required=True)})
+    return 'root', {'choice': {'variants.v0': {'attr0': 1}}}
+
+
+def run(root, name, cfg, lazy):
+    factory = TypeFactory(root, lazy=lazy)
+    template = factory.build_template(name)
+    template.fill_from_cfg(cfg)
+    template.to_config()
+    return factory
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print("{:>8s} {:>6s} {:>10s} {:>12s} {:>8s}".format("variants", "files", "seconds", "peak KiB", "built"))
+    for variants in args.sizes:
+        with tempfile.TemporaryDirectory() as root:
+            name, cfg = generate_folder(root, variants)
+            for lazy in (False, True):
+                measure(root, name, cfg, variants, lazy, args.repeat)
+
+
+def measure(root, name, cfg, variants, lazy, repeat):
+    seconds = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(root, name, cfg, lazy)
+        elapsed = time.perf_counter() - start
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+    tracemalloc.start()
+    factory = run(root, name, cfg, lazy)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    built = len([typ for typ in factory.types if typ.startswith('variants.')])
+    print("{:8d} {:>6s} {:10.4f} {:12.1f} {:8d}".format(
+        variants, "lazy" if lazy else "eager", seconds, peak / 1024, built))
+
+
+if __name__ == "__main__":
+    main()
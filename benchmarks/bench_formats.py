@@ -0,0 +1,47 @@
+"""
+Load time of a large config in every registered file format.
+
+    python -m benchmarks.bench_formats
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from typeconf import TypeFactory
+from typeconf import utils as u
+from .synthetic import generate_nested, example_config
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--attributes', type=int, default=50)
+    parser.add_argument('--references', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as root:
+        name = generate_nested(os.path.join(root, "templates"), args.depth, args.attributes, args.references)
+        cfg = example_config(TypeFactory(os.path.join(root, "templates")).schema(name))
+        for extension in u.LOADERS:
+            path = os.path.join(root, "config" + extension)
+            try:
+                u.write_file(path, cfg)
+            except ImportError as e:
+                print("{:9s} skipped, {}".format(extension, e))
+                continue
+            best = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                loaded = u.read_file(path)
+                seconds = time.perf_counter() - start
+                assert loaded == cfg
+                best = seconds if best is None else min(best, seconds)
+            print("{:9s} {:10d} bytes {:9.6f}s".format(extension, os.path.getsize(path), best))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Attribute access and size of Config compared to frozen configs.
+
+    python -m benchmarks.bench_frozen_config
+"""
+import argparse
+import logging
+import tempfile
+import timeit
+import tracemalloc
+
+from typeconf import TypeFactory
+from .synthetic import generate_nested, example_config
+
+
+def size_of(fn):
+    tracemalloc.start()
+    result = fn()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=1000000)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as root:
+        name = generate_nested(root, depth=3, attributes=20, references=1)
+        factory = TypeFactory(root)
+
+    def filled():
+        template = factory.build_template(name)
+        template.fill_from_cfg(example_config(factory.schema(name)))
+        template.parser.parse()
+        return template
+
+    # the frozen classes are created once per template
+    filled().to_config(frozen=True)
+    for frozen in (False, True):
+        template = filled()
+        config, size = size_of(lambda: template.to_config(frozen))
+        access = timeit.timeit("config.ref0.ref0.attr3", globals={'config': config}, number=args.number)
+        print("{:12s} config.a.b.c {:6.1f} ns, {:6d} bytes".format(
+            type(config).__name__ if not frozen else "frozen", access / args.number * 1e9, size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Cost of to_config after changing a few leaves of a large template.
+
+    python -m benchmarks.bench_incremental
+"""
+import argparse
+import logging
+import random
+import tempfile
+import time
+
+from typeconf import TypeFactory
+from .synthetic import generate_nested, example_config
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--attributes', type=int, default=50)
+    parser.add_argument('--references', type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as root:
+        name = generate_nested(root, args.depth, args.attributes, args.references)
+        factory = TypeFactory(root)
+    template = factory.build_template(name)
+    template.fill_from_cfg(example_config(factory.schema(name)))
+    leaves = [path for path in template.index.paths if path.split('.')[-1].startswith('attr')]
+
+    start = time.perf_counter()
+    template.to_config()
+    print("{} leaves, full to_config {:9.6f}s".format(len(leaves), time.perf_counter() - start))
+
+    rng = random.Random(0)
+    for changes in (1, 10, 100, 1000, len(leaves)):
+        template.update({path: "2" for path in rng.sample(leaves, changes)})
+        start = time.perf_counter()
+        template.to_config()
+        print("{:6d} changed leaves      {:9.6f}s".format(changes, time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Time to the first value and peak memory of lazy compared to eager to_config.
+
+    python -m benchmarks.bench_lazy_config
+"""
+import argparse
+import logging
+import tempfile
+import time
+import tracemalloc
+
+from typeconf import TypeFactory
+from .synthetic import generate_nested, example_config
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--attributes', type=int, default=50)
+    parser.add_argument('--references', type=int, default=4)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as root:
+        name = generate_nested(root, args.depth, args.attributes, args.references)
+        factory = TypeFactory(root)
+    cfg = example_config(factory.schema(name))
+
+    for lazy in (False, True):
+        template = factory.build_template(name)
+        template.fill_from_cfg(cfg)
+        tracemalloc.start()
+        start = time.perf_counter()
+        config = template.to_config(lazy=lazy)
+        # a worker reading one block
+        for _ in range(args.depth - 1):
+            config = config.ref0
+        config.attr0
+        first = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print("{:5s} first access {:9.6f}s, peak {:9d} bytes".format(
+            "lazy" if lazy else "eager", first, peak))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Compares startup time of eager and lazy template registration.
+
+    python -m benchmarks.bench_lazy_loading --files 2000
+"""
+import argparse
+import tempfile
+import time
+
+from typeconf import TypeFactory
+from .synthetic import generate_repository
+
+
+def startup(root, name, lazy):
+    start = time.perf_counter()
+    factory = TypeFactory(lazy=lazy)
+    factory.register_search_directory(root)
+    registered = time.perf_counter()
+    factory.build_template(name)
+    built = time.perf_counter()
+    return registered - start, built - registered
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--attributes', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        name = generate_repository(root, files=args.files, attributes=args.attributes, references=1)
+        print("{} templates, building {}".format(args.files, name))
+        for lazy in (False, True):
+            runs = [startup(root, name, lazy) for _ in range(args.repeat)]
+            register, build = min(runs, key=sum)
+            print("{:6s} register {:8.3f}s build {:8.3f}s total {:8.3f}s".format(
+                "lazy" if lazy else "eager", register, build, register + build))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Validation time of long numeric lists, item by item and in one numpy pass.
+
+    python -m benchmarks.bench_lists --sizes 1000 100000 1000000
+"""
+import argparse
+import logging
+import random
+import time
+
+from typeconf import TypeFactory
+from typeconf import parser as p
+
+
+def build_template(ndarray):
+    factory = TypeFactory()
+    factory.register_cfg('lists', {
+        'weights': {'type': 'array', 'dtype': 'float', 'min': 0.0, 'max': 1.0,
+                    'ndarray': ndarray, 'required': True},
+    })
+    return factory.build_template('lists')
+
+
+def best(fn, repeat):
+    seconds = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    if p.numpy() is None:
+        print("numpy is not installed, only the items are validated one by one")
+
+    print("{:>8s} {:>10s} {:>12s} {:>10s} {:>12s}".format("items", "mode", "validate s", "fill s", "items/s"))
+    rng = random.Random(0)
+    for size in args.sizes:
+        cfg = {'weights': [rng.random() for _ in range(size)]}
+        modes = [('items', False)]
+        if p.numpy() is not None:
+            modes += [('numpy', False), ('ndarray', True)]
+        for mode, ndarray in modes:
+            template = build_template(ndarray)
+            numpy = p._NUMPY[:]
+            if mode == 'items':
+                p._NUMPY[:] = [None]
+            try:
+                validate = best(lambda: template.validate(cfg), args.repeat)
+
+                def fill():
+                    template.fill_from_cfg(cfg)
+                    template.to_config()
+                filled = best(fill, args.repeat)
+            finally:
+                p._NUMPY[:] = numpy
+            print("{:8d} {:>10s} {:12.4f} {:10.4f} {:12.0f}".format(
+                size, mode, validate, filled, size / validate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Memory per attribute of built types and filled templates, using tracemalloc.
+
+    python -m benchmarks.bench_memory --sizes 1000 10000 100000
+"""
+import argparse
+import gc
+import logging
+import tracemalloc
+
+from typeconf import TypeFactory
+from .synthetic import attribute, example_config
+
+# attributes per template file
+PER_FILE = 100
+
+
+def register(factory, attributes):
+    """Registers a root template referencing templates with PER_FILE int attributes each"""
+    root = {}
+    for idx in range(max(1, attributes // PER_FILE)):
+        name = "part{}".format(idx)
+        factory.register_cfg(name, {"attr{}".format(a): attribute('int') for a in range(PER_FILE)})
+        root[name] = attribute(name)
+    factory.register_cfg('root', root)
+    return 'root'
+
+
+def measure(fn):
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print("{:>8s} {:>14s} {:>14s} {:>14s}".format("attrs", "schema B/attr", "template B/attr", "config B/attr"))
+    for attributes in args.sizes:
+        factory = TypeFactory()
+        name = register(factory, attributes)
+        # the path index is shared like the types
+        schema, schema_size = measure(lambda: (factory.schema(name), factory.path_index(name))[0])
+        cfg = example_config(schema)
+
+        def fill():
+            template = factory.build_template(name)
+            template.fill_from_cfg(cfg)
+            template.parser.parse()
+            return template
+        template, template_size = measure(fill)
+        _, config_size = measure(template.to_config)
+        print("{:8d} {:14.1f} {:14.1f} {:14.1f}".format(
+            attributes, schema_size / attributes, template_size / attributes, config_size / attributes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Cost of merging config layers for growing base configs and overrides.
+
+    python -m benchmarks.bench_merge
+"""
+import argparse
+import random
+import time
+
+from typeconf.merge import merge
+
+
+def nested(width, depth):
+    if depth == 0:
+        return {"attr{}".format(a): a for a in range(width)}
+    return {"sub{}".format(a): nested(width, depth - 1) for a in range(width)}
+
+
+def overrides(rng, width, depth, count):
+    layer = {}
+    for _ in range(count):
+        node = layer
+        for _ in range(depth):
+            node = node.setdefault("sub{}".format(rng.randrange(width)), {})
+        node["attr{}".format(rng.randrange(width))] = -1
+    return layer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--width', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for depth in (2, 3, 4, 5):
+        base = nested(args.width, depth)
+        for count in (1, 10, 100):
+            layers = [("base", base), ("site", overrides(rng, args.width, depth, count)),
+                      ("run", overrides(rng, args.width, depth, count))]
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                merge(layers)
+            print("{:8d} base values, {:4d} overrides per layer {:9.6f}s".format(
+                args.width ** (depth + 1), count, (time.perf_counter() - start) / args.repeat))
+
+
+if __name__ == "__main__":
+    main()
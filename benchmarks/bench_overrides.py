@@ -0,0 +1,48 @@
+"""
+Applying batches of dot path overrides through the path index compared to
+setting a nested dict from the root for every override.
+
+    python -m benchmarks.bench_overrides
+"""
+import argparse
+import random
+import tempfile
+import time
+
+from typeconf import TypeFactory
+from typeconf import utils as u
+from .synthetic import generate_nested
+
+
+def from_root(template, overrides):
+    for path, value in overrides:
+        template.parser.value = u.dot2dict(path, value)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--overrides', type=int, default=10000)
+    parser.add_argument('--depth', type=int, default=6)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        name = generate_nested(root, depth=args.depth, attributes=20, references=2)
+        factory = TypeFactory(root)
+
+    start = time.perf_counter()
+    template = factory.build_template(name)
+    print("{} paths indexed in {:.3f}s".format(len(template.index), time.perf_counter() - start))
+
+    rng = random.Random(0)
+    leaves = [path for path in template.index.paths if path.split('.')[-1].startswith('attr')]
+    overrides = [(rng.choice(leaves), "1") for _ in range(args.overrides)]
+
+    for label, apply in (("nested dict from root", from_root), ("path index", type(template).update)):
+        template = factory.build_template(name)
+        start = time.perf_counter()
+        apply(template, overrides)
+        print("{:22s} {:8.3f}s for {} overrides".format(label, time.perf_counter() - start, len(overrides)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Overhead of the profiling hooks, disabled and recording.
+
+    python -m benchmarks.bench_profiling
+"""
+import argparse
+import logging
+import tempfile
+import time
+import timeit
+
+from typeconf import TypeFactory
+from typeconf import profiling
+from .synthetic import generate_repository, example_config
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=1000)
+    parser.add_argument('--number', type=int, default=1000000)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    seconds = timeit.timeit("with phase('parse'): pass", globals={'phase': profiling.phase}, number=args.number)
+    print("disabled phase {:6.1f} ns".format(seconds / args.number * 1e9))
+
+    with tempfile.TemporaryDirectory() as root:
+        top = generate_repository(root, args.files)
+        for recording in (False, True):
+            start = time.perf_counter()
+            with profiling.record() if recording else profiling.phase("off") as recorder:
+                factory = TypeFactory(root)
+                template = factory.build_template(top)
+                template.fill_from_cfg(example_config(factory.schema(top)))
+                template.to_config()
+            print("{:9s} build {:9.6f}s".format(
+                "recording" if recording else "disabled", time.perf_counter() - start))
+        print(recorder.report(top=5))
+
+
+if __name__ == "__main__":
+    main()
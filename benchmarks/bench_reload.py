@@ -0,0 +1,50 @@
+"""
+Cost of TypeFactory.refresh after changing a few templates of a large repository.
+
+    python -m benchmarks.bench_reload
+"""
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+
+from typeconf import TypeFactory
+from .synthetic import generate_repository
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--attributes', type=int, default=10)
+    parser.add_argument('--folders', type=int, default=20)
+    parser.add_argument('--references', type=int, default=2)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as root:
+        top = generate_repository(root, args.files, args.attributes, args.folders, args.references)
+        start = time.perf_counter()
+        factory = TypeFactory(root)
+        for name in list(factory.paths):
+            factory.schema(name)
+        print("{} templates, full build {:9.6f}s".format(len(factory.types), time.perf_counter() - start))
+        factory.build_template(top)
+
+        paths = sorted(factory.paths.values())
+        rng = random.Random(0)
+        for changes in (1, 10, 100):
+            for path in rng.sample(paths, changes):
+                with open(path, 'a') as f:
+                    f.write("\n")
+                stat = os.stat(path)
+                os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            start = time.perf_counter()
+            affected = factory.refresh()
+            print("{:4d} changed files, {:5d} rebuilt types {:9.6f}s".format(
+                changes, len(affected), time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Sending a large config to workers as a pickled Config and as a shared snapshot.
+
+    python -m benchmarks.bench_snapshot
+"""
+import argparse
+import logging
+import pickle
+import tempfile
+import time
+import timeit
+
+from typeconf import TypeFactory
+from typeconf import snapshot as s
+from .synthetic import generate_nested, example_config
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--depth', type=int, default=5)
+    parser.add_argument('--attributes', type=int, default=50)
+    parser.add_argument('--references', type=int, default=4)
+    parser.add_argument('--number', type=int, default=100000)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as root:
+        name = generate_nested(root, args.depth, args.attributes, args.references)
+        factory = TypeFactory(root)
+    template = factory.build_template(name)
+    template.fill_from_cfg(example_config(factory.schema(name)))
+    config = template.to_config()
+
+    start = time.perf_counter()
+    snapshot = s.Snapshot.create(config)
+    print("snapshot of {} bytes written in {:9.6f}s".format(len(snapshot.buffer), time.perf_counter() - start))
+    try:
+        path = ".".join(["ref0"] * (args.depth - 1) + ["attr0"])
+        for label, payload in (("pickled Config", config), ("shared snapshot", snapshot)):
+            data = pickle.dumps(payload)
+            s._ATTACHED.clear()
+            start = time.perf_counter()
+            received = pickle.loads(data)
+            if isinstance(received, s.Snapshot):
+                received = received.config
+            attach = time.perf_counter() - start
+            access = timeit.timeit("config.ref0.ref0.attr0", globals={'config': received}, number=args.number)
+            print("{:16s} {:9d} bytes sent, ready after {:9.6f}s, config.a.b.c {:6.1f} ns".format(
+                label, len(data), attach, access / args.number * 1e9))
+        print("first lookup of {} in a new snapshot view {:9.6f}s".format(
+            path, timeit.timeit(lambda: snapshot.config.lookup(path), number=1000) / 1000))
+    finally:
+        snapshot.close()
+        snapshot.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Streams a grid sweep and reports throughput and peak memory.
+
+    python -m benchmarks.bench_sweep --points 100000
+"""
+import argparse
+import logging
+import tempfile
+import time
+import tracemalloc
+
+from typeconf import TypeFactory
+from .synthetic import generate_nested, example_config
+
+
+def run_sweep(template, points):
+    # two axes with points values in total
+    args = ['attr0=range({})'.format(points // 10), 'attr1=range(10)']
+    count = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    for config in template.sweep(args):
+        count += 1
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, duration, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--points', type=int, default=100000)
+    parser.add_argument('--attributes', type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as root:
+        name = generate_nested(root, depth=2, attributes=args.attributes, references=1)
+        factory = TypeFactory(root)
+        template = factory.build_template(name)
+        template.fill_from_cfg(example_config(factory.schema(name)))
+
+    for points in (args.points // 10, args.points):
+        count, duration, peak = run_sweep(template, points)
+        print("{:8d} configs {:8.3f}s {:8.0f} configs/s peak memory {:8.1f} KiB".format(
+            count, duration, count / duration, peak / 1024))
+
+
+if __name__ == "__main__":
+    main()
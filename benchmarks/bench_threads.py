@@ -0,0 +1,61 @@
+"""
+Requests per second of threads validating configs, with a factory per
+request compared to a shared factory and a TemplatePool.
+
+    python -m benchmarks.bench_threads
+"""
+import argparse
+import logging
+import tempfile
+import threading
+import time
+
+from typeconf import TypeFactory
+from typeconf.pool import TemplatePool
+from .synthetic import generate_repository, example_config
+
+
+def throughput(handle, threads, requests):
+    def worker():
+        for _ in range(requests):
+            handle()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return threads * requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as root:
+        top = generate_repository(root, args.files)
+        shared = TypeFactory(root, lazy=True)
+        cfg = example_config(shared.schema(top))
+        templates = TemplatePool(shared, top)
+
+        def per_request():
+            template = TypeFactory(root, lazy=True).build_template(top)
+            template.fill_from_cfg(cfg)
+            template.to_config()
+
+        def pooled():
+            with templates.template() as template:
+                template.fill_from_cfg(cfg)
+                template.to_config()
+
+        for threads in (1, 4, 16):
+            print("{:3d} threads: factory per request {:9.1f} requests/s, shared pool {:9.1f} requests/s".format(
+                threads, throughput(per_request, threads, max(1, args.requests // threads)),
+                throughput(pooled, threads, args.requests * 50 // threads)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Validation throughput of compiled plans against filling a template.
+
+    python -m benchmarks.bench_validation
+"""
+import argparse
+import copy
+import logging
+import tempfile
+import time
+
+from typeconf import TypeFactory
+from .synthetic import generate_nested, example_config
+
+
+def fill_and_convert(factory, name, cfgs):
+    for cfg in cfgs:
+        template = factory.build_template(name)
+        template.fill_from_cfg(cfg)
+        template.to_config()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--configs', type=int, default=1000)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--attributes', type=int, default=20)
+    parser.add_argument('--references', type=int, default=2)
+    args = parser.parse_args()
+    # defaults are logged as warnings
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as root:
+        name = generate_nested(root, args.depth, args.attributes, args.references)
+        factory = TypeFactory(root)
+        cfg = example_config(factory.schema(name))
+
+    # filling consumes the config
+    cfgs = [copy.deepcopy(cfg) for _ in range(args.configs)]
+    start = time.perf_counter()
+    fill_and_convert(factory, name, cfgs)
+    fill = time.perf_counter() - start
+
+    template = factory.build_template(name)
+    template.compile()
+    start = time.perf_counter()
+    template.validate_many([cfg] * args.configs)
+    plan = time.perf_counter() - start
+
+    print("{} configs, depth {}, {} attributes, {} references".format(
+        args.configs, args.depth, args.attributes, args.references))
+    print("fill_from_cfg + to_config {:10.0f} configs/s".format(args.configs / fill))
+    print("validate_many             {:10.0f} configs/s".format(args.configs / plan))
+
+
+if __name__ == "__main__":
+    main()
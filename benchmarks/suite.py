@@ -0,0 +1,110 @@
+"""
+Times and peak memory of the main phases on generated template trees.
+Results can be stored and compared to find regressions:
+
+    python -m benchmarks.suite --output before.json
+    python -m benchmarks.suite --compare before.json
+    python -m benchmarks.suite --width 50 --depth 6 --fanout 8 --no-diamonds
+"""
+import argparse
+import json
+import logging
+import tempfile
+import time
+import tracemalloc
+
+from typeconf import TypeFactory
+from .synthetic import generate_tree, example_config, flatten_config
+
+
+def measure(setup, run, repeat):
+    """
+    Returns:
+        Best time of run(setup()) and its peak memory in bytes
+    """
+    best = None
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    state = setup()
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def phases(root, top):
+    """Yields (name, setup, run) of every measured phase"""
+    factory = TypeFactory(root)
+    cfg = example_config(factory.schema(top))
+    args = flatten_config(cfg)
+
+    def template():
+        return factory.build_template(top)
+
+    def filled():
+        state = template()
+        state.fill_from_cfg(cfg)
+        return state
+
+    def compiled():
+        state = template()
+        state.compile()
+        return state
+
+    def parsed():
+        state = filled()
+        state.parser.parse()
+        return state
+
+    yield "discovery", lambda: root, lambda root: TypeFactory(root, lazy=True)
+    yield "build", lambda: TypeFactory(root, lazy=True), lambda factory: factory.schema(top)
+    yield "get", lambda: factory, lambda factory: factory.get(top)
+    yield "fill_from_cfg", template, lambda state: state.fill_from_cfg(cfg)
+    yield "fill_from_cl", template, lambda state: state.fill_from_cl(args)
+    yield "parse", filled, lambda state: state.parser.parse()
+    yield "to_config", parsed, lambda state: state.parser.to_config()
+    yield "compile", template, lambda state: state.compile()
+    yield "validate", compiled, lambda state: state.validate(cfg)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--width', type=int, default=20, help="attributes per template")
+    parser.add_argument('--depth', type=int, default=5, help="levels of templates")
+    parser.add_argument('--fanout', type=int, default=4, help="variants per level folder")
+    parser.add_argument('--no-diamonds', dest='diamonds', action='store_false')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="write the results to this json file")
+    parser.add_argument('--compare', help="json file of earlier results")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    baseline = {}
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as root:
+        top = generate_tree(root, args.width, args.depth, args.fanout, args.diamonds)
+        print("{:14s} {:>12s} {:>12s} {:>9s}".format("phase", "seconds", "peak bytes", "change"))
+        for name, setup, run in phases(root, top):
+            seconds, peak = measure(setup, run, args.repeat)
+            results[name] = {"seconds": seconds, "peak": peak}
+            change = ""
+            if name in baseline:
+                change = "{:+8.1f}%".format((seconds / baseline[name]["seconds"] - 1) * 100)
+            print("{:14s} {:12.6f} {:12d} {:>9s}".format(name, seconds, peak, change))
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump({"parameters": vars(args), "results": results}, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
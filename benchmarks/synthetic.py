@@ -0,0 +1,122 @@
+"""Generates synthetic template repositories for the benchmarks"""
+import os
+import random
+
+
+def attribute(dtype, required=False, default=0):
+    attr = {'type': 'datatype', 'dtype': dtype, 'required': required}
+    if not required:
+        attr['default'] = default
+    return attr
+
+
+def template_name(folder, idx):
+    return "group{}.t{}".format(folder, idx)
+
+
+def write_template(path, cfg):
+    import yaml
+    with open(path, 'w') as f:
+        yaml.safe_dump(cfg, f)
+
+
+def generate_repository(root, files=1000, attributes=10, folders=10, references=2, seed=0):
+    """
+    Writes `files` templates spread over `folders` subfolders of root.
+    Every template has `attributes` int attributes and references up to
+    `references` templates that were generated before it.
+
+    Returns:
+        The name of the template with the most transitive dependencies
+    """
+    rng = random.Random(seed)
+    names = []
+    for folder in range(folders):
+        os.makedirs(os.path.join(root, "group{}".format(folder)), exist_ok=True)
+
+    for idx in range(files):
+        folder = idx % folders
+        cfg = {"attr{}".format(a): attribute('int') for a in range(attributes)}
+        for r, dep in enumerate(rng.sample(names, min(references, len(names)))):
+            cfg["ref{}".format(r)] = attribute(dep, required=True)
+        path = os.path.join(root, "group{}".format(folder), "t{}.yaml".format(idx))
+        write_template(path, cfg)
+        names.append(template_name(folder, idx))
+    return names[-1]
+
+
+def generate_nested(root, depth=5, attributes=10, references=2):
+    """
+    Writes a chain of `depth` templates where every level has `attributes`
+    int attributes and references the level below `references` times.
+
+    Returns:
+        The name of the top level template
+    """
+    os.makedirs(root, exist_ok=True)
+    for level in range(depth):
+        cfg = {"attr{}".format(a): attribute('int') for a in range(attributes)}
+        if level > 0:
+            for r in range(references):
+                cfg["ref{}".format(r)] = attribute("level{}".format(level - 1))
+        write_template(os.path.join(root, "level{}.yaml".format(level)), cfg)
+    return "level{}".format(depth - 1)
+
+
+def generate_tree(root, width=10, depth=4, fanout=4, diamonds=True):
+    """
+    Writes `depth` levels of templates. Level L is a folder with `fanout`
+    variants, i.e. a one_of_type, and every variant has `width` int attributes
+    and chooses one variant of level L - 1 in `child`. With diamonds every level
+    also has a template shared by the variants of the level above,
+    which itself uses the level below as well.
+
+    Returns:
+        The name of the top level template
+    """
+    for level in range(depth):
+        folder = os.path.join(root, "level{}".format(level))
+        os.makedirs(folder, exist_ok=True)
+        for variant in range(fanout):
+            cfg = {"attr{}".format(a): attribute('int') for a in range(width)}
+            if level > 0:
+                cfg["child"] = attribute("level{}".format(level - 1), required=True)
+                if diamonds:
+                    cfg["shared"] = attribute("shared{}".format(level - 1), required=True)
+            write_template(os.path.join(folder, "variant{}.yaml".format(variant)), cfg)
+        if diamonds:
+            cfg = {"attr{}".format(a): attribute('int') for a in range(width)}
+            if level > 0:
+                cfg["child"] = attribute("level{}".format(level - 1), required=True)
+            write_template(os.path.join(root, "shared{}.yaml".format(level)), cfg)
+    cfg = {"attr{}".format(a): attribute('int') for a in range(width)}
+    cfg["child"] = attribute("level{}".format(depth - 1), required=True)
+    write_template(os.path.join(root, "top.yaml"), cfg)
+    return "top"
+
+
+def flatten_config(cfg, prefix=""):
+    """Returns the values of cfg as command line arguments path=value"""
+    args = []
+    for key, value in cfg.items():
+        if isinstance(value, dict):
+            args.extend(flatten_config(value, prefix + key + "."))
+        else:
+            args.append("{}{}={}".format(prefix, key, value))
+    return args
+
+
+def example_config(parser):
+    """Returns a config setting every attribute of the schema"""
+    from typeconf import parser as p
+    from typeconf.type_factory import CompositeType, OneOfType, OneOf
+    if isinstance(parser, CompositeType):
+        return {key: example_config(a.parser) for key, a in parser.attributes.items()
+                if not a.const}
+    if isinstance(parser, OneOfType):
+        key = sorted(parser.subtypes)[0]
+        return {key: example_config(parser.subtypes[key])}
+    if isinstance(parser, OneOf):
+        return sorted(parser.options)[0]
+    values = {p.IntType: 1, p.FloatType: 1.0, p.BoolType: True, p.StringType: "a"}
+    return values[type(parser)]
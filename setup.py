@@ -12,7 +12,15 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/kilsenp/TypeConf",
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=['benchmarks', 'benchmarks.*']),
+    extras_require={
+        'fast': ['orjson'],
+        'msgpack': ['msgpack'],
+        'numpy': ['numpy'],
+    },
+    entry_points={
+        'console_scripts': ['typeconf-verify=typeconf.verify:main'],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+from typeconf import TypeFactory
+from typeconf import aio
+from typeconf import utils as u
+from typeconf.cache import TemplateCache
+
+
+def test_async_factory():
+    async def main():
+        fac = TypeFactory()
+        await fac.aregister_search_directory("tests/templates", lazy=True)
+        config_template = await fac.abuild_template('class1')
+        await config_template.afill_from_file("tests/configs/config.yaml")
+        cfg = u.read_file("tests/configs/config.yaml")
+        validated = await asyncio.gather(*[config_template.avalidate(cfg) for _ in range(5)])
+        return config_template.to_config(), validated, await config_template.avalidate_many([cfg])
+
+    config, validated, many = asyncio.run(main())
+    expected = TypeFactory("tests/templates").build_template('class1')
+    expected.fill_from_file("tests/configs/config.yaml")
+    assert config == expected.to_config()
+    assert validated == [config] * 5 and many == [config]
+
+
+def test_batched_reads(monkeypatch):
+    batches = []
+    read_batch = aio.read_batch
+    def record(paths):
+        batches.append(paths)
+        return read_batch(paths)
+    monkeypatch.setattr(aio, "read_batch", record)
+
+    async def main():
+        paths = ["tests/configs/config.yaml"] * 10 + ["tests/templates/class1.yaml", "missing.yaml"]
+        return await asyncio.gather(*[aio.read_file(path) for path in paths], return_exceptions=True)
+
+    results = asyncio.run(main())
+    # concurrent reads of one file are shared
+    assert sorted(len(batch) for batch in batches) == [1, 1, 1]
+    assert results[0] == results[9] and results[0] is not results[9]
+    assert isinstance(results[-1], FileNotFoundError)
+
+
+def test_factory_in_several_loops():
+    fac = TypeFactory()
+
+    async def main():
+        await fac.aregister_search_directory("tests/templates", lazy=True)
+        # contend for the lock of the factory
+        return await asyncio.gather(fac.abuild_template('class1'), fac.abuild_template('class2'))
+
+    asyncio.run(main())
+    templates = asyncio.run(main())
+    assert [template.name for template in templates] == ['class1', 'class2']
+
+
+def test_no_blocking_calls_on_loop(monkeypatch, tmpdir):
+    threads = []
+    def record(fn):
+        def recorded(*args, **kwargs):
+            threads.append((fn.__name__, threading.current_thread()))
+            return fn(*args, **kwargs)
+        return recorded
+    monkeypatch.setattr(TypeFactory, "stat", staticmethod(record(TypeFactory.stat)))
+    monkeypatch.setattr(TypeFactory, "locked", record(TypeFactory.locked))
+    monkeypatch.setattr(TemplateCache, "open", record(TemplateCache.open))
+
+    async def main():
+        fac = TypeFactory(cache=str(tmpdir))
+        await fac.aregister_search_directory("tests/templates")
+        await fac.abuild_template('class1')
+
+    asyncio.run(main())
+    assert {name for name, _ in threads} == {'stat', 'locked', 'open'}
+    assert all(thread is not threading.main_thread() for _, thread in threads)
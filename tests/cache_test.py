@@ -0,0 +1,70 @@
+import os
+import shutil
+from typeconf import TypeFactory
+from typeconf.cache import TemplateCache
+from typeconf.utils import read_file
+
+
+def build_template(templates, cache_dir):
+    return TypeFactory(templates, cache=cache_dir).build_template('class1')
+
+
+def to_config(config_template):
+    config_template.fill_from_file("tests/configs/config.yaml")
+    return config_template.to_config()
+
+
+def test_cache(tmpdir, monkeypatch):
+    templates = str(tmpdir.join("templates"))
+    cache_dir = str(tmpdir.join("cache"))
+    shutil.copytree("tests/templates", templates)
+
+    cold = to_config(build_template(templates, cache_dir))
+    assert len(os.listdir(os.path.join(cache_dir, "types"))) > 0
+
+    # a warm start neither parses templates nor builds types, including
+    # the subtype chosen by the config
+    cfg = read_file("tests/configs/config.yaml")
+    def fail(*args, **kwargs):
+        raise AssertionError("should be cached")
+    with monkeypatch.context() as m:
+        m.setattr("typeconf.utils.read_file", fail)
+        m.setattr(TypeFactory, "build_from_node", fail)
+        warm = build_template(templates, cache_dir)
+        warm.fill_from_cfg(cfg)
+        assert warm.to_config() == cold
+
+    # only the changed template is rebuilt, the folder does not depend on
+    # the contents of its subtypes
+    path = os.path.join(templates, "classes", "class3.yaml")
+    with open(path, 'a') as f:
+        f.write("\nAttribute2:\n    dtype: int\n    required: false\n    default: 1\n    type: datatype\n")
+    rebuilt = []
+    build_from_node = TypeFactory.build_from_node
+    def record(self, node):
+        rebuilt.append(node.name)
+        return build_from_node(self, node)
+    monkeypatch.setattr(TypeFactory, "build_from_node", record)
+    to_config(build_template(templates, cache_dir))
+    assert rebuilt == ['classes.class3']
+
+
+def test_unchanged_content(tmpdir):
+    templates = str(tmpdir.join("templates"))
+    shutil.copytree("tests/templates", templates)
+    cache = TemplateCache(str(tmpdir.join("cache")))
+    cache.open(templates)
+    path = os.path.join(templates, "class2.yaml")
+    _, digest = cache.read(path)
+    os.utime(path, (0, 0))
+    assert cache.read(path)[1] == digest
+
+
+def test_stored_types_leave_out_subtypes(tmpdir):
+    fac = TypeFactory("tests/templates")
+    fac.build_template('class1').fill_from_file("tests/configs/config.yaml")
+    assert fac.schema('classes').subtypes.types['classes.class3'] is not None
+    cache = TemplateCache(str(tmpdir))
+    cache.store_type("key", fac.schema('classes'))
+    subtypes = cache.load_type("key").subtypes
+    assert subtypes.types == {'classes.class3': None, 'classes.class4': None}
@@ -1,3 +1,5 @@
+import pickle
+import pytest
 from typeconf import TypeFactory
 
 def test_to_config():
@@ -8,3 +10,41 @@ def test_to_config():
     # set values manually
     config = config_template.to_config()
     assert config.AttributeClass.Attribute1 == 5
+
+
+def test_frozen_config():
+    fac = TypeFactory("tests/templates")
+    config_template = fac.build_template('class1')
+    config_template.fill_from_file("tests/configs/config.yaml")
+    config = config_template.to_config(frozen=True)
+    assert config.AttributeClass.Attribute1 == 10
+    assert config.AttributeFolder['classes.class3'].Attribute1 == 5
+    assert config._asdict() == config_template.to_config()
+    with pytest.raises(AttributeError):
+        config.AttributeTypo
+    with pytest.raises(AttributeError):
+        config.AttributeInt = 3
+    assert hash(config) == hash(pickle.loads(pickle.dumps(config)))
+    # one class per template
+    other = fac.build_template('class1')
+    other.fill_from_file("tests/configs/config.yaml")
+    assert type(other.to_config(frozen=True)) is type(config)
+
+
+def test_lazy_config():
+    fac = TypeFactory("tests/templates")
+    config_template = fac.build_template('class1')
+    config_template.fill_from_file("tests/configs/config.yaml")
+    config_template.update({'AttributeFolder.classes.class3.Attribute1': 'x'})
+    config = config_template.to_config(lazy=True)
+    # the invalid branch is only parsed on access
+    assert config.AttributeClass.Attribute1 == 10
+    assert config.AttributeInt == 10
+    with pytest.raises(ValueError):
+        config.AttributeFolder['classes.class3'].Attribute1
+    with pytest.raises(ValueError):
+        config.materialize()
+    config_template.update({'AttributeFolder.classes.class3.Attribute1': '5'})
+    config = config_template.to_config(lazy=True)
+    assert config.materialize() == config_template.to_config()
+    assert config_template.to_config(lazy=True) == config_template.to_config()
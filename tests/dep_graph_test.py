@@ -0,0 +1,56 @@
+from typeconf.dep_graph import DependencyGraph
+import pytest
+
+
+def make_graph(edges):
+    graph = DependencyGraph()
+    for name, deps in edges.items():
+        graph.add(name, dependency_list=set(deps))
+    return graph
+
+
+def test_dep_order():
+    graph = make_graph({'a': ['b', 'c'], 'b': ['d'], 'c': ['d'], 'd': []})
+    order = list(graph.get_dep_order('a'))
+    assert sorted(order) == ['b', 'c', 'd']
+    assert order.index('d') < order.index('b')
+    assert order.index('d') < order.index('c')
+    assert list(graph.get_dep_order('d')) == []
+
+
+def test_cycle():
+    graph = make_graph({'a': ['b'], 'b': ['c'], 'c': ['a']})
+    with pytest.raises(ValueError, match="Cycle a -> b -> c -> a"):
+        graph.get_dep_order('a')
+    graph = make_graph({'a': ['b'], 'b': ['x']})
+    with pytest.raises(ValueError, match="Unknown type x. Required by a -> b"):
+        graph.get_dep_order('a')
+
+
+def test_invalidation():
+    graph = make_graph({'a': ['b'], 'b': ['c'], 'c': [], 'd': [], 'e': ['d']})
+    assert list(graph.get_dep_order('a')) == ['c', 'b']
+    graph.get_dep_order('e')
+    graph.add('c', dependency_list={'d'})
+    assert 'e' in graph.orders
+    assert list(graph.get_dep_order('a')) == ['d', 'c', 'b']
+    graph.add('d', dependency_list={'a'})
+    with pytest.raises(ValueError, match="Cycle"):
+        graph.get_dep_order('a')
+
+
+def test_deep_chain():
+    depth = 10000
+    graph = make_graph({str(i): [str(i - 1)] if i > 0 else [] for i in range(depth)})
+    assert len(graph.get_dep_order(str(depth - 1))) == depth - 1
+
+
+def test_intermediate_orders():
+    graph = make_graph({'a': ['b', 'c'], 'b': ['d'], 'c': ['d'], 'd': []})
+    graph.get_dep_order('a')
+    assert sorted(graph.orders) == ['a', 'b', 'c', 'd']
+    assert list(graph.orders['b']) == ['d']
+    assert list(graph.orders['c']) == ['d']
+    graph = make_graph({'a': ['b'], 'b': []})
+    graph.add('c', dependency_list={'a'})
+    assert graph.orders == {}
@@ -0,0 +1,64 @@
+import pytest
+import yaml
+from typeconf import TypeFactory
+from typeconf.expression import CACHE_SIZE, compile_expression, evaluate, evaluation_order
+
+
+def write(path, cfg):
+    with open(str(path), 'w') as f:
+        yaml.safe_dump(cfg, f)
+
+
+def expression(default):
+    return {'type': 'datatype', 'dtype': 'int', 'required': False, 'eval': True, 'default': default}
+
+
+@pytest.fixture
+def factory(tmpdir):
+    write(tmpdir.join("model.yaml"), {
+        'depth': {'type': 'datatype', 'dtype': 'int', 'required': False, 'default': 2}})
+    write(tmpdir.join("net.yaml"), {
+        'total': expression("hidden + model.depth"),
+        'hidden': expression("width * 4"),
+        'width': {'type': 'datatype', 'dtype': 'int', 'required': True},
+        'model': {'type': 'datatype', 'dtype': 'model', 'required': False, 'default': {}}})
+    return TypeFactory(str(tmpdir))
+
+
+def test_compile_expression():
+    assert compile_expression("a + 1") is compile_expression("a + 1")
+    assert compile_expression("max(a, b.c)").names == {'max', 'a', 'b'}
+    for i in range(CACHE_SIZE + 10):
+        compile_expression("a + {}".format(i))
+    assert compile_expression.cache_info().currsize <= CACHE_SIZE
+    assert evaluate("4 + 2") == 6
+    assert evaluate(6) == 6
+    with pytest.raises(NameError):
+        evaluate("open('file')")
+    with pytest.raises(ValueError, match="private"):
+        evaluate("().__class__")
+    with pytest.raises(ValueError, match="private"):
+        evaluate("__import__('os')")
+    with pytest.raises(ValueError, match="Cycle in expressions a -> b -> a"):
+        evaluation_order({'a': ['b'], 'b': ['a']})
+    assert evaluation_order({'a': ['b', 'x'], 'b': []}) == ['b', 'a']
+
+
+def test_references(factory):
+    template = factory.build_template('net')
+    template.fill_from_cfg({'width': 8})
+    config = template.to_config()
+    assert (config.hidden, config.total) == (32, 34)
+    assert template.validate({'width': 8}) == config
+    assert template.to_config(lazy=True).total == 34
+
+    # expressions are evaluated again when a value they refer to changes
+    template.update({'width': '2', 'model.depth': '1'})
+    config = template.to_config()
+    assert (config.hidden, config.total) == (8, 9)
+    template.update({'hidden': 'width + 1'})
+    assert template.to_config().total == 4
+    assert template.parser.raw_value()['hidden'] == 'width + 1'
+
+    with pytest.raises(ValueError, match="Cycle"):
+        factory.build_template('net').validate({'width': 1, 'hidden': 'total'})
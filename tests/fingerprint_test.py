@@ -0,0 +1,71 @@
+import pytest
+from typeconf import TypeFactory
+from typeconf import fingerprint
+from typeconf.config import Config
+from typeconf.snapshot import loads, dumps
+
+
+@pytest.fixture
+def config_template():
+    config_template = TypeFactory("tests/templates").build_template('class1')
+    config_template.fill_from_file("tests/configs/config.yaml")
+    return config_template
+
+
+def test_canonical(config_template):
+    config = config_template.to_config()
+    digest = config_template.fingerprint()
+    assert digest == fingerprint.hexdigest(config)
+    assert digest == fingerprint.hexdigest(config_template.to_config(frozen=True))
+    assert digest == fingerprint.hexdigest(loads(dumps(config)))
+    reordered = Config(reversed(list(config.items())))
+    assert digest == fingerprint.hexdigest(reordered)
+
+    assert fingerprint.digest({'a': [1, 2]}) == fingerprint.digest({'a': (1, 2)})
+    assert fingerprint.digest({'a': 1}) != fingerprint.digest({'a': 1.0})
+    assert fingerprint.digest({'a': 1}) != fingerprint.digest({'a': True})
+    assert fingerprint.digest({'a': "1"}) != fingerprint.digest({'a': 1})
+
+
+def test_unsupported_leaves():
+    with pytest.raises(TypeError, match="Cannot fingerprint values of type object"):
+        fingerprint.digest({'a': object()})
+    with pytest.raises(TypeError):
+        fingerprint.digest({'a': {1, 2}})
+    np = pytest.importorskip("numpy")
+    assert fingerprint.digest({'a': np.int64(1)}) == fingerprint.digest({'a': np.int64(1)})
+    assert fingerprint.digest({'a': np.int64(1)}) != fingerprint.digest({'a': np.int32(1)})
+
+
+def test_incremental(config_template, monkeypatch):
+    before = config_template.fingerprint()
+    hashed = []
+    encode_leaf = fingerprint.encode_leaf
+    def record(value):
+        hashed.append(value)
+        return encode_leaf(value)
+    monkeypatch.setattr(fingerprint, "encode_leaf", record)
+
+    assert config_template.fingerprint() == before
+    assert hashed == []
+
+    config_template.update({'AttributeClass.Attribute1': 11})
+    after = config_template.fingerprint()
+    assert after != before
+    assert hashed == [11]
+    monkeypatch.undo()
+    assert after == fingerprint.hexdigest(config_template.to_config())
+
+
+def test_diff(config_template):
+    old = config_template.to_config(frozen=True)
+    config_template.fill_from_cl(['AttributeClass.Attribute1=11',
+                                  'AttributeFolder.classes.class4.Attribute1=7'])
+    new = config_template.to_config(frozen=True)
+    changes = fingerprint.diff(old, new)
+    assert ('AttributeClass.Attribute1', 10, 11) in changes
+    assert ('AttributeFolder.classes.class3', old.AttributeFolder['classes.class3'],
+            fingerprint.MISSING) in changes
+    assert len(changes) == 3
+    assert fingerprint.diff(old, old) == []
+    assert fingerprint.diff(new._asdict(), new) == []
@@ -0,0 +1,53 @@
+from typeconf import TypeFactory
+from typeconf import fingerprint
+from typeconf.attribute import Attribute
+
+
+def test_repeated_to_config():
+    config_template = TypeFactory("tests/templates").build_template('class1')
+    config_template.fill_from_file("tests/configs/config.yaml")
+    first = config_template.to_config()
+    assert first == config_template.to_config()
+    assert (first.AttributeConst, first.Attributeeval) == (5, 6)
+
+
+def test_incremental(monkeypatch):
+    config_template = TypeFactory("tests/templates").build_template('class1')
+    config_template.fill_from_file("tests/configs/config.yaml")
+    first = config_template.to_config()
+
+    parsed = []
+    parse = Attribute.parse
+    def record(self, parser):
+        parsed.append(self.name)
+        return parse(self, parser)
+    monkeypatch.setattr(Attribute, "parse", record)
+
+    config_template.fill_from_cl(['AttributeClass.Attribute1=3'])
+    second = config_template.to_config()
+    assert parsed == ['AttributeClass', 'Attribute1']
+    assert second.AttributeClass.Attribute1 == 3
+    assert first.AttributeClass.Attribute1 == 10
+    assert second.AttributeFolder == first.AttributeFolder
+
+    parsed.clear()
+    assert config_template.to_config() == second
+    frozen = config_template.to_config(frozen=True)
+    config_template.fill_from_cl(['AttributeClass.Attribute1=4'])
+    # unchanged branches of frozen configs are reused
+    assert config_template.to_config(frozen=True).AttributeFolder is frozen.AttributeFolder
+    assert parsed == ['AttributeClass', 'Attribute1']
+
+
+def test_changed_configs():
+    config_template = TypeFactory("tests/templates").build_template('class1')
+    config_template.fill_from_file("tests/configs/config.yaml")
+    config = config_template.to_config()
+    digest = config_template.fingerprint()
+    config.AttributeInt = "not an int"
+    config.AttributeClass.Attribute1 = 999
+    config_template.fill_from_cl(['AttributeString=changed'])
+    config = config_template.to_config()
+    assert (config.AttributeInt, config.AttributeClass.Attribute1) == (10, 10)
+    config_template.fill_from_cl(['AttributeString=test'])
+    assert config_template.fingerprint() == fingerprint.hexdigest(config_template.to_config()) == digest
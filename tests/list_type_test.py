@@ -0,0 +1,129 @@
+import json
+import pytest
+from typeconf import TypeFactory
+from typeconf import parser as p
+from typeconf.snapshot import dumps, loads
+
+
+def build_template(**attributes):
+    factory = TypeFactory()
+    factory.register_cfg('lists', attributes)
+    return factory.build_template('lists')
+
+
+def test_list_of_dtype():
+    template = build_template(
+        weights={'type': 'datatype', 'dtype': 'list<float>', 'required': True},
+        names={'type': 'datatype', 'dtype': 'list<string>', 'required': False, 'default': []})
+    template.fill_from_cfg({'weights': [1, 0.5]})
+    config = template.to_config()
+    assert config.weights == [1.0, 0.5]
+    assert config.names == []
+
+    template.fill_from_cl(['weights=[2, 3.5]', 'names=["a", "b"]'])
+    assert template.to_config().weights == [2.0, 3.5]
+    assert template.to_config().names == ["a", "b"]
+
+    with pytest.raises(ValueError):
+        template.validate({'weights': [1.0, "a"]})
+    with pytest.raises(ValueError):
+        template.validate({'weights': 1.0})
+
+
+def test_array():
+    template = build_template(grid={'type': 'array', 'dtype': 'int', 'shape': [None, 2],
+                                    'min': 0, 'max': 9, 'required': True})
+    assert template.validate({'grid': [[0, 1], [2, 9]]}).grid == [[0, 1], [2, 9]]
+    for grid in ([[0, 1], [2]], [0, 1], [[0, 10]], [[0, True]], [[0, 1.5]]):
+        with pytest.raises(ValueError):
+            template.validate({'grid': grid})
+
+
+@pytest.mark.parametrize("vectorize", [False, True])
+def test_long_lists(monkeypatch, vectorize):
+    if vectorize:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(p, "_NUMPY", [None])
+    template = build_template(scores={'type': 'array', 'dtype': 'float', 'min': 0, 'required': True})
+    counts = build_template(counts={'type': 'array', 'dtype': 'int', 'shape': [None, 2], 'required': True})
+    values = [float(i) for i in range(1000)]
+    assert template.validate({'scores': values}).scores == values
+    assert template.validate({'scores': list(range(1000))}).scores == values
+    with pytest.raises(ValueError):
+        template.validate({'scores': values + [-1.0]})
+    with pytest.raises(ValueError):
+        template.validate({'scores': values + ["a"]})
+    # bools are rejected by short and long lists alike
+    for length in (4, 64, 1000):
+        with pytest.raises(ValueError):
+            template.validate({'scores': [1.0, True] + [1.0] * (length - 2)})
+        with pytest.raises(ValueError):
+            counts.validate({'counts': [[1, True]] + [[1, 1]] * (length - 1)})
+
+
+def test_ndarray():
+    np = pytest.importorskip("numpy")
+    template = build_template(anchors={'type': 'array', 'dtype': 'float', 'shape': [3, 2],
+                                       'ndarray': True, 'required': True})
+    template.fill_from_cfg({'anchors': [[0, 1], [2, 3], [4, 5]]})
+    anchors = template.to_config().anchors
+    assert isinstance(anchors, np.ndarray) and anchors.dtype == np.float64
+    assert not anchors.flags.writeable
+    with pytest.raises(ValueError):
+        template.validate({'anchors': [[0, 1], [2, 3]]})
+
+
+def test_unsupported_elements():
+    factory = TypeFactory()
+    factory.register_cfg('inner', {'a': {'type': 'datatype', 'dtype': 'int', 'required': True}})
+    factory.register_cfg('outer', {'b': {'type': 'datatype', 'dtype': 'list<inner>', 'required': True}})
+    with pytest.raises(ValueError, match="lists of inner"):
+        factory.build_template('outer')
+    factory.register_cfg('strings', {'c': {'type': 'array', 'dtype': 'string', 'required': True}})
+    with pytest.raises(ValueError, match="arrays hold"):
+        factory.build_template('strings')
+
+
+def test_frozen_lists():
+    template = build_template(weights={'type': 'datatype', 'dtype': 'list<float>', 'required': True},
+                              grid={'type': 'array', 'dtype': 'int', 'shape': [None, 2], 'required': True})
+    template.fill_from_cfg({'weights': [1, 0.5], 'grid': [[0, 1], [2, 3]]})
+    config = template.to_config(frozen=True)
+    assert config.weights == (1.0, 0.5)
+    assert config.grid == ((0, 1), (2, 3))
+    assert hash(config) == hash(template.to_config(frozen=True))
+    assert json.loads(str(config)) == {'weights': [1.0, 0.5], 'grid': [[0, 1], [2, 3]]}
+    assert template.to_config().weights == [1.0, 0.5]
+
+
+def test_ndarray_configs():
+    np = pytest.importorskip("numpy")
+    template = build_template(anchors={'type': 'array', 'dtype': 'float', 'shape': [None, 2],
+                                       'ndarray': True, 'required': True})
+    template.fill_from_cfg({'anchors': [[0, 1], [2, 3]]})
+    frozen = template.to_config(frozen=True)
+    assert not frozen.anchors.flags.writeable
+    assert hash(frozen) == hash(template.to_config(frozen=True))
+    assert frozen == template.to_config(frozen=True)
+    template.fill_from_cfg({'anchors': [[0, 1]]})
+    assert frozen != template.to_config(frozen=True)
+
+    config = template.to_config()
+    assert json.loads(str(config)) == {'anchors': [[0.0, 1.0]]}
+    assert json.loads(str(frozen)) == {'anchors': [[0.0, 1.0], [2.0, 3.0]]}
+    snapshot = loads(dumps(config))
+    assert np.array_equal(snapshot.anchors, config.anchors)
+
+
+def test_sweep_lists():
+    template = build_template(weights={'type': 'datatype', 'dtype': 'list<float>', 'required': True},
+                              grid={'type': 'array', 'dtype': 'int', 'shape': [None, 2], 'required': True},
+                              steps={'type': 'datatype', 'dtype': 'int', 'required': True})
+    template.fill_from_cfg({'weights': [1], 'grid': [[0, 0]], 'steps': 1})
+    configs = list(template.sweep(['weights=[1,2]', 'grid=[[1,2]]', 'steps=[1,2]']))
+    assert [(c.weights, c.grid, c.steps) for c in configs] == \
+        [([1.0, 2.0], [[1, 2]], 1), ([1.0, 2.0], [[1, 2]], 2)]
+    configs = list(template.sweep(['weights=[[1],[2,3]]', 'grid=[[[1,2]],[]]']))
+    assert [(c.weights, c.grid) for c in configs] == \
+        [([1.0], [[1, 2]]), ([1.0], []), ([2.0, 3.0], [[1, 2]]), ([2.0, 3.0], [])]
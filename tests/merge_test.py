@@ -0,0 +1,43 @@
+from typeconf import TypeFactory
+from typeconf import utils as u
+from typeconf.merge import merge
+
+
+def test_merge():
+    base = {'a': {'b': 1, 'c': 2}, 'd': {'e': 3}}
+    merged, provenance = merge([("base", base), ("site", {'a': {'b': 5}}), ("run", {'a': {'c': 6}, 'f': 7})])
+    assert merged == {'a': {'b': 5, 'c': 6}, 'd': {'e': 3}, 'f': 7}
+    assert base == {'a': {'b': 1, 'c': 2}, 'd': {'e': 3}}
+    # untouched subtrees are shared
+    assert merged['d'] is base['d']
+    assert [provenance.source(path) for path in [('a', 'b'), ('a', 'c'), ('d', 'e'), ('f',)]] == \
+        ["site", "run", "base", "run"]
+    assert provenance.source(('d', 'x')) is None and provenance.source(('x',)) is None
+
+    # replacing a subtree replaces the records below it
+    merged, provenance = merge([("base", base), ("site", {'a': {'b': 5}}), ("run", {'a': 0})])
+    assert merged['a'] == 0 and provenance.source(('a', 'b')) == "run"
+
+
+def test_fill_from_layers():
+    fac = TypeFactory("tests/templates")
+    config_template = fac.build_template('class1')
+    site = {'AttributeInt': 11, 'AttributeFolder': {'classes.class4': {'Attribute1': 1}}}
+    config_template.fill_from_layers(["tests/configs/config.yaml", ("site", site)],
+                                     ['AttributeClass.Attribute1=3'])
+    config = config_template.to_config()
+    # choosing another subtype replaces the previous choice
+    assert config.AttributeFolder == {'classes.class4': {'Attribute1': 1}}
+    assert (config.AttributeInt, config.AttributeString, config.AttributeClass.Attribute1) == (11, "test", 3)
+    assert config_template.source('AttributeInt') == "site"
+    assert config_template.source('AttributeString') == "tests/configs/config.yaml"
+    assert config_template.source('AttributeClass.Attribute1') == "command line"
+    assert config_template.source('AttributeFolder.classes.class4.Attribute1') == "site"
+    # defaults and keys of no layer
+    assert config_template.source('AttributeInt4') is None
+    assert config_template.source('AttributeConst') is None
+
+    expected = fac.build_template('class1')
+    expected.fill_from_cfg(dict(u.read_file("tests/configs/config.yaml"), **site))
+    expected.update({'AttributeClass.Attribute1': '3'})
+    assert expected.to_config() == config
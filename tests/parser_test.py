@@ -19,3 +19,17 @@ def test_int_parser():
     with pytest.raises(ValueError):
         parser.value = "1.1"
         parser.parse()
+
+
+def test_instantiate():
+    parser = p.IntType("test")
+    instance = parser.instantiate()
+    assert not hasattr(instance, '__dict__')
+    assert instance.name == "test" and not instance.isset
+
+    class Custom(p.IntType):
+        def __init__(self, name):
+            super().__init__(name)
+            self.limit = 3
+    instance = Custom("custom").instantiate()
+    assert instance.limit == 3
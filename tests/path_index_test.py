@@ -0,0 +1,45 @@
+from typeconf import TypeFactory
+from typeconf import utils as u
+import pytest
+
+
+@pytest.fixture
+def config_template():
+    config_template = TypeFactory("tests/templates").build_template('class1')
+    config_template.fill_from_file("tests/configs/config.yaml")
+    return config_template
+
+
+def test_index(config_template):
+    index = config_template.index
+    assert index.resolve('AttributeClass.Attribute1') == (('AttributeClass', 'Attribute1'), ())
+    assert index.resolve('AttributeFolder.classes.class4.Attribute1') == \
+        (('AttributeFolder', 'classes.class4', 'Attribute1'), (1,))
+    assert 'AttributeClass.Attribute3' not in index
+
+
+def test_fill_from_cl(config_template):
+    config_template.fill_from_cl(['AttributeInt=3', 'AttributeFolder.classes.class4.Attribute1=7'])
+    config = config_template.to_config()
+    assert config.AttributeInt == 3
+    assert config.AttributeFolder == {'classes.class4': {'Attribute1': 7}}
+
+
+def test_unknown_paths(config_template):
+    with pytest.raises(ValueError, match="AttributeClass.Attribute3, Nothing"):
+        config_template.fill_from_cl(['AttributeInt=3', 'AttributeClass.Attribute3=1', 'Nothing=1'])
+    # nothing was set
+    assert config_template.to_config().AttributeInt == 10
+
+
+def test_fill_from_env(config_template):
+    config_template.fill_from_env(environ={'TYPECONF_AttributeClass__Attribute1': '4', 'OTHER': '1',
+                                           'TYPECONF_PROFILE': 'trace.json'})
+    assert config_template.to_config().AttributeClass.Attribute1 == 4
+
+
+def test_fill_from_cfg_keeps_cfg():
+    cfg = u.read_file("tests/configs/config.yaml")
+    config_template = TypeFactory("tests/templates").build_template('class1')
+    config_template.fill_from_cfg(cfg)
+    assert cfg == u.read_file("tests/configs/config.yaml")
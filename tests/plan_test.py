@@ -0,0 +1,36 @@
+import copy
+from typeconf import TypeFactory
+from typeconf import utils as u
+import pytest
+
+
+def test_validate():
+    fac = TypeFactory("tests/templates")
+    cfg = u.read_file("tests/configs/config.yaml")
+    original = copy.deepcopy(cfg)
+
+    config_template = fac.build_template('class1')
+    config = config_template.validate(cfg)
+    assert cfg == original
+
+    config_template.fill_from_cfg(cfg)
+    assert config == config_template.to_config()
+    assert config.AttributeFolder['classes.class3'].Attribute1 == 5
+
+    # the template was not filled by validate
+    other = fac.build_template('class1')
+    assert other.validate_many([original, original]) == [config, config]
+    assert not other.parser.isset
+
+
+def test_validate_errors():
+    config_template = TypeFactory("tests/templates").build_template('class1')
+    cfg = u.read_file("tests/configs/config.yaml")
+    with pytest.raises(ValueError, match="AttributeClass.Attribute1"):
+        config_template.validate(dict(cfg, AttributeClass={}))
+    with pytest.raises(ValueError, match="AttributeConst is const"):
+        config_template.validate(dict(cfg, AttributeConst=3))
+    with pytest.raises(ValueError, match="Expected Int"):
+        config_template.validate(dict(cfg, AttributeInt=True))
+    with pytest.raises(ValueError, match="Unknown type"):
+        config_template.validate(dict(cfg, AttributeFolder={'classes.class5': {}}))
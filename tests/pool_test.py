@@ -0,0 +1,47 @@
+import threading
+import pytest
+from typeconf import TypeFactory
+from typeconf.pool import TemplatePool
+from typeconf.type_factory import TypeFactory as Factory
+
+
+def test_concurrent_build(monkeypatch):
+    built = []
+    build_from_node = Factory.build_from_node
+    def record(self, node):
+        built.append(node.name)
+        return build_from_node(self, node)
+    monkeypatch.setattr(Factory, "build_from_node", record)
+
+    fac = TypeFactory("tests/templates", lazy=True)
+    barrier = threading.Barrier(8)
+    schemas = []
+    def build():
+        barrier.wait()
+        template = fac.build_template('class1')
+        schemas.append((fac.schema('class1'), template.index))
+    threads = [threading.Thread(target=build) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(schemas) == 8
+    assert all(schema is schemas[0][0] and index is schemas[0][1] for schema, index in schemas)
+    # every type is built once
+    assert len(built) == len(set(built))
+
+
+def test_pool():
+    pool = TemplatePool(TypeFactory("tests/templates"), 'class1', maxsize=1)
+    with pool.template() as template:
+        template.fill_from_file("tests/configs/config.yaml")
+        template.update({'AttributeInt': '3'})
+        assert template.to_config().AttributeInt == 3
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.01)
+    again = pool.acquire()
+    assert again is template
+    # the values were reset
+    assert not again.parser.isset and again.parser.raw_value() == {}
+    again.fill_from_file("tests/configs/config.yaml")
+    assert again.to_config().AttributeInt == 10
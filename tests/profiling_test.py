@@ -0,0 +1,33 @@
+import json
+from typeconf import TypeFactory
+from typeconf import profiling
+from typeconf.verify import main
+
+
+def test_record(tmpdir):
+    with profiling.record() as recorder:
+        fac = TypeFactory("tests/templates")
+        config_template = fac.build_template('class1')
+        config_template.fill_from_file("tests/configs/config.yaml")
+        config_template.to_config()
+    assert profiling.RECORDER is None
+    for phase in ("discover", "read", "dep_order", "build_type", "instantiate", "read_config", "fill", "parse"):
+        assert phase in recorder.phases
+    assert recorder.templates[("build_type", "class2")][0] == 1
+    assert recorder.counters["files_read"] == 4
+    assert recorder.counters["attributes_validated"] > 0
+    assert "build_template" in recorder.report()
+    trace = recorder.trace()["traceEvents"]
+    assert any(event["name"] == "parse class1" and event["ph"] == "X" for event in trace)
+
+    # nothing is recorded without a recorder
+    fac.build_template('class1')
+    assert recorder.phases["build_template"][0] == 1
+
+
+def test_verify_profile(tmpdir):
+    path = str(tmpdir.join("trace.json"))
+    main(['class1', 'tests/configs/config.yaml', '-t', 'tests/templates', '-q', '--profile', path])
+    with open(path) as f:
+        names = {event["name"] for event in json.load(f)["traceEvents"]}
+    assert "validate class1" in names
@@ -0,0 +1,86 @@
+import logging
+import os
+import shutil
+import threading
+from typeconf import TypeFactory
+
+NEW_ATTRIBUTE = "\nAttribute3:\n    dtype: int\n    required: false\n    default: 3\n    type: datatype\n"
+
+
+def touch(path, content):
+    with open(path, 'a') as f:
+        f.write(content)
+    # make sure the change is visible with coarse timestamps
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_refresh(tmpdir, monkeypatch):
+    templates = str(tmpdir.join("templates"))
+    shutil.copytree("tests/templates", templates)
+    fac = TypeFactory(templates)
+    config_template = fac.build_template('class1')
+    config_template.fill_from_file("tests/configs/config.yaml")
+    fac.build_template('classes.class4')
+    reloaded = []
+    config_template.on_reload(reloaded.append)
+    assert fac.refresh() == set()
+
+    read = []
+    load_files = TypeFactory.load_files
+    def record(self, names):
+        read.extend(names)
+        return load_files(self, names)
+    monkeypatch.setattr(TypeFactory, "load_files", record)
+
+    touch(os.path.join(templates, "class2.yaml"), NEW_ATTRIBUTE)
+    assert fac.refresh() == {'class2', 'class1'}
+    assert read == ['class2']
+    assert 'classes.class4' in fac.types
+    assert reloaded == [config_template]
+    config = config_template.to_config()
+    # values set before are kept
+    assert config.AttributeClass == {'Attribute1': 10, 'Attribute2': '4 + 2', 'Attribute3': 3}
+
+    # folders are updated with their files
+    os.remove(os.path.join(templates, "classes", "class4.yaml"))
+    shutil.copy(os.path.join(templates, "class2.yaml"), os.path.join(templates, "classes", "class5.yaml"))
+    assert fac.refresh() == {'classes', 'classes.class4', 'classes.class5', 'class1'}
+    assert set(fac.schema('classes').subtypes) == {'classes.class3', 'classes.class5'}
+
+
+def test_reload_waits_for_users(tmpdir):
+    templates = str(tmpdir.join("templates"))
+    shutil.copytree("tests/templates", templates)
+    fac = TypeFactory(templates)
+    template = fac.build_template('class2')
+    template.fill_from_cfg({'Attribute1': 1})
+    touch(os.path.join(templates, "class2.yaml"), NEW_ATTRIBUTE)
+    with template.lock:
+        parser = template.parser
+        refresh = threading.Thread(target=fac.refresh)
+        refresh.start()
+        refresh.join(0.2)
+        # the factory is rebuilt, the template is reloaded once it is released
+        assert refresh.is_alive() and template.parser is parser
+    refresh.join()
+    assert template.parser is not parser
+    assert template.to_config().Attribute3 == 3
+
+
+def test_chosen_subtype_removed(tmpdir, caplog):
+    templates = str(tmpdir.join("templates"))
+    shutil.copytree("tests/templates", templates)
+    fac = TypeFactory(templates)
+    config_template = fac.build_template('class1')
+    config_template.fill_from_file("tests/configs/config.yaml")
+    config = config_template.to_config()
+    parser = config_template.parser
+
+    os.remove(os.path.join(templates, "classes", "class3.yaml"))
+    with caplog.at_level(logging.ERROR):
+        assert 'class1' in fac.refresh()
+    assert "AttributeFolder.classes.class3 was set but is no longer in the template" in caplog.text
+    # the template keeps its values
+    assert config_template.parser is parser
+    assert config_template.to_config() == config
@@ -0,0 +1,55 @@
+import multiprocessing
+import pickle
+import pytest
+from typeconf import TypeFactory
+from typeconf.snapshot import Snapshot, dumps, loads
+
+
+def filled_config():
+    config_template = TypeFactory("tests/templates").build_template('class1')
+    config_template.fill_from_file("tests/configs/config.yaml")
+    return config_template.to_config()
+
+
+def read_width(snapshot):
+    return snapshot.config.lookup('AttributeFolder.classes.class3.Attribute1')
+
+
+def test_dumps():
+    config = filled_config()
+    snapshot = loads(dumps(config))
+    assert snapshot == config
+    assert snapshot.AttributeClass.Attribute1 == 10
+    assert snapshot['AttributeFolder']['classes.class3'].Attribute1 == 5
+    assert snapshot.lookup('AttributeFolder.classes.class3.Attribute1') == 5
+    assert snapshot.AttributeTypo is None
+    assert set(snapshot) == set(config)
+    with pytest.raises(AttributeError):
+        snapshot.AttributeInt = 3
+    values = {'list': [1, 2.5, "a", None, True], 'big': 2 ** 70, 'empty': {}}
+    assert loads(dumps(values)).to_config() == dict(values, list=(1, 2.5, "a", None, True))
+
+
+def test_shared_memory():
+    config = filled_config()
+    snapshot = Snapshot.create(config)
+    try:
+        # only the name is sent to the workers
+        assert len(pickle.dumps(snapshot)) < 200
+        with multiprocessing.get_context("spawn").Pool(2) as pool:
+            assert pool.map(read_width, [snapshot] * 4) == [5] * 4
+        assert snapshot.config == config
+    finally:
+        snapshot.close()
+        snapshot.unlink()
+
+
+def test_file(tmpdir):
+    path = str(tmpdir.join("config.snapshot"))
+    with Snapshot.write(filled_config(), path) as snapshot:
+        assert pickle.loads(pickle.dumps(snapshot.config)).AttributeInt == 10
+
+
+def test_unhashable_values():
+    snapshot = loads(dumps({'a': {1, 2}, 'b': {1, 2}}))
+    assert snapshot.a == {1, 2} and snapshot.b == {1, 2}
@@ -0,0 +1,50 @@
+import itertools
+from typeconf import TypeFactory
+from typeconf import utils as u
+
+
+def test_parse_sweep():
+    assert u.parse_sweep("[0.1, 0.01]") == ["0.1", "0.01"]
+    assert u.parse_sweep("range(10,40,10)") == range(10, 40, 10)
+    assert u.parse_sweep("0.1") is None
+    assert u.parse_sweep("[1, 2]", dimensions=1) is None
+    assert u.parse_sweep("[[1, 2], []]", dimensions=1) == ["[1, 2]", "[]"]
+    assert u.parse_sweep('[["a"]]', dimensions=1) == ['["a"]']
+
+
+def test_iter_product():
+    axes = [range(3), ["a", "b"], range(1, 2)]
+    assert list(u.iter_product(axes)) == list(itertools.product(*axes))
+    assert list(u.iter_product([range(2), []])) == []
+    assert list(u.iter_product([])) == [()]
+
+
+def test_replace_path():
+    sub = {'c': 1}
+    cfg = {'a': {'b': 1}, 'd': sub}
+    new = u.replace_path(cfg, ['a', 'b'], 2)
+    assert new == {'a': {'b': 2}, 'd': sub}
+    assert new['d'] is sub
+    assert cfg['a']['b'] == 1
+
+
+def test_sweep():
+    config_template = TypeFactory("tests/templates").build_template('class1')
+    config_template.fill_from_file("tests/configs/config.yaml")
+    configs = list(config_template.sweep(
+        ['AttributeInt=[1,2,3]', 'AttributeClass.Attribute1=range(2)', 'AttributeString=swept']))
+    assert [(c.AttributeInt, c.AttributeClass.Attribute1) for c in configs] == \
+        [(1, 0), (1, 1), (2, 0), (2, 1), (3, 0), (3, 1)]
+    assert all(c.AttributeString == "swept" for c in configs)
+
+    config = config_template.to_config()
+    assert (config.AttributeInt, config.AttributeClass.Attribute1) == (10, 10)
+
+
+def test_sweep_after_to_config():
+    config_template = TypeFactory("tests/templates").build_template('class1')
+    config_template.fill_from_file("tests/configs/config.yaml")
+    config = config_template.to_config()
+    configs = list(config_template.sweep(['AttributeInt=[1,2]']))
+    assert [c.AttributeInt for c in configs] == [1, 2]
+    assert config_template.to_config() == config
@@ -0,0 +1,64 @@
+import pickle
+import pytest
+from typeconf import TypeFactory
+from typeconf.config_template import ConfigTemplate
+from typeconf import utils as u
+
+
+def test_lazy_loading():
+    fac = TypeFactory("tests/templates", lazy=True)
+    assert set(fac.pending) == {'class1', 'class2', 'classes.class3', 'classes.class4'}
+    fac.build_template('class2')
+    assert set(fac.pending) == {'class1', 'classes.class3', 'classes.class4'}
+
+    config_template = fac.build_template('class1')
+    # the subtypes of a folder are read once they are chosen
+    assert set(fac.pending) == {'classes.class3', 'classes.class4'}
+    config_template.fill_from_file("tests/configs/config.yaml")
+    assert set(fac.pending) == {'classes.class4'}
+    config = config_template.to_config()
+    assert config.AttributeFolder['classes.class3'].Attribute1 == 5
+
+
+def test_templates_are_independent():
+    fac = TypeFactory("tests/templates")
+    template1 = fac.build_template('class2')
+    template2 = fac.build_template('class2')
+    template1.fill_from_cfg({'Attribute1': 1})
+    template2.fill_from_cfg({'Attribute1': 2})
+    assert template1.to_config().Attribute1 == 1
+    assert template2.to_config().Attribute1 == 2
+    # the shared schema is never filled
+    assert not fac.types['class2'].attributes['Attribute1'].parser.isset
+    assert len(fac.types['class2'].children) == 0
+
+
+def test_lazy_subtypes():
+    fac = TypeFactory("tests/templates")
+    config_template = fac.build_template('class1')
+    assert 'classes' in fac.types
+    assert 'classes.class3' not in fac.types and 'classes.class4' not in fac.types
+    assert set(fac.types['classes'].subtypes) == {'classes.class3', 'classes.class4'}
+
+    cfg = u.read_file("tests/configs/config.yaml")
+    cfg['AttributeFolder'] = {'classes.class4': {'Attribute1': 1}}
+    config_template.validate(cfg)
+    assert 'classes.class4' in fac.types and 'classes.class3' not in fac.types
+
+    config_template.fill_from_cfg(cfg)
+    config_template.update({'AttributeFolder.classes.class4.Attribute1': 7})
+    assert config_template.to_config().AttributeFolder == {'classes.class4': {'Attribute1': 7}}
+    assert 'classes.class3' not in fac.types
+
+
+def test_pickled_subtypes():
+    fac = TypeFactory("tests/templates")
+    config_template = fac.build_template('class1')
+    config_template.fill_from_file("tests/configs/config.yaml")
+    schema = pickle.loads(pickle.dumps(fac.schema('class1')))
+    # the chosen subtype was built and is pickled with the schema
+    copy = ConfigTemplate('class1', schema.instantiate())
+    copy.fill_from_file("tests/configs/config.yaml")
+    assert copy.to_config() == config_template.to_config()
+    with pytest.raises(ValueError, match="not built before it was pickled"):
+        schema.attributes['AttributeFolder'].parser.subtypes['classes.class4']
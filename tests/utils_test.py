@@ -0,0 +1,74 @@
+import importlib.util
+import shutil
+from typeconf import utils as u
+from typeconf import TypeFactory
+import pytest
+
+
+def test_discover():
+    found = [(structure, type_enum) for _, structure, type_enum in u.discover("tests/templates")]
+    assert found == [
+        (['class1'], u.FILE_ENUM),
+        (['class2'], u.FILE_ENUM),
+        (['classes', 'class3'], u.FILE_ENUM),
+        (['classes', 'class4'], u.FILE_ENUM),
+        (['classes'], u.DIR_ENUM),
+    ]
+
+
+def test_discover_name(tmpdir):
+    tmpdir.join("formal.yaml").write("a: 1")
+    assert [s for _, s, _ in u.discover(str(tmpdir))] == [['formal']]
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_read_files(processes):
+    paths = [path for path, _, type_enum in u.discover("tests/templates") if type_enum == u.FILE_ENUM]
+    expected = [u.read_file(path) for path in paths]
+    assert u.read_files(paths, workers=2, processes=processes) == expected
+
+
+def test_concurrent_factory():
+    fac = TypeFactory("tests/templates", workers=4)
+    config_template = fac.build_template('class1')
+    config_template.fill_from_file("tests/configs/config.yaml")
+    assert config_template.to_config().AttributeClass.Attribute1 == 10
+
+
+@pytest.mark.parametrize("extension", ['.json', '.marshal', '.msgpack'])
+def test_formats(tmpdir, monkeypatch, extension):
+    if extension == '.msgpack':
+        pytest.importorskip("msgpack")
+    monkeypatch.setattr(u, "SUPPORTED_FILETYPES", list(u.SUPPORTED_FILETYPES))
+    monkeypatch.setattr(u, "LOADERS", dict(u.LOADERS))
+    monkeypatch.setattr(u, "DUMPERS", dict(u.DUMPERS))
+    if extension == '.marshal':
+        u.register_format('.marshal', u.read_from_marshal, u.write_to_marshal)
+    # the same templates and config in another format
+    templates = tmpdir.join("templates")
+    for path, structure, type_enum in u.discover("tests/templates"):
+        if type_enum == u.FILE_ENUM:
+            target = templates.join(*structure[:-1]).ensure(dir=True).join(structure[-1] + extension)
+            u.write_file(str(target), u.read_file(path))
+    config = str(tmpdir.join("config" + extension))
+    u.write_file(config, u.read_file("tests/configs/config.yaml"))
+
+    template = TypeFactory(str(templates)).build_template('class1')
+    template.fill_from_file(config)
+    expected = TypeFactory("tests/templates").build_template('class1')
+    expected.fill_from_file("tests/configs/config.yaml")
+    assert template.to_config() == expected.to_config()
+
+    with pytest.raises(ValueError, match="Unknown File Ending"):
+        u.read_file("config.toml")
+
+
+def test_unregistered_formats(tmpdir):
+    templates = tmpdir.join("templates")
+    shutil.copytree("tests/templates", str(templates))
+    templates.join("stray.marshal").write_binary(b"\x00")
+    if importlib.util.find_spec("msgpack") is None:
+        templates.join("stray.msgpack").write_binary(b"\x00")
+    fac = TypeFactory(str(templates))
+    assert 'stray' not in fac.types
+    fac.build_template('class1')
@@ -0,0 +1,30 @@
+import json
+import multiprocessing
+from typeconf import verify as v
+import pytest
+
+
+@pytest.fixture
+def configs(tmpdir):
+    valid = tmpdir.join("valid.yaml")
+    valid.write(open("tests/configs/config.yaml").read())
+    tmpdir.mkdir("sub").join("invalid.yaml").write("AttributeInt: true\n")
+    return tmpdir
+
+
+@pytest.mark.parametrize("workers, method", [(None, None), (2, None), (2, "spawn")])
+def test_verify(configs, workers, method):
+    paths = v.find_configs([str(configs)])
+    context = None if method is None else multiprocessing.get_context(method)
+    results = list(v.verify(["tests/templates"], 'class1', paths, workers, context=context))
+    assert [r['path'] for r in results] == paths
+    assert [r['valid'] for r in results] == [False, True]
+    assert "Expected Int" in results[0]['error']
+
+
+def test_main(configs):
+    output = str(configs.join("summary.json"))
+    assert v.main(['class1', str(configs.join("*.yaml")), '-t', 'tests/templates', '-o', output]) == 0
+    summary = json.load(open(output))
+    assert (summary['total'], summary['invalid']) == (1, 0)
+    assert v.main(['class1', str(configs), '-t', 'tests/templates', '-q']) == 1
@@ -0,0 +1,142 @@
+"""
+Helpers of the async methods of TypeFactory and ConfigTemplate.
+
+Reading files and validating runs in a bounded thread pool, so the event
+loop only does the bookkeeping. Files requested in the same iteration of
+the event loop are read together in few executor jobs.
+
+    factory = TypeFactory()
+    await factory.aregister_search_directory('templates')
+    template = await factory.abuild_template('parent')
+    config = await template.avalidate(cfg)
+"""
+import asyncio
+import copy
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from . import utils as u
+
+DEFAULT_WORKERS = 4
+
+_EXECUTOR = None
+# event loop -> BatchReader
+_READERS = weakref.WeakKeyDictionary()
+# factory -> event loop -> asyncio.Lock serializing its async loading
+_LOCKS = weakref.WeakKeyDictionary()
+
+
+def executor():
+    """Returns the executor of all async methods"""
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(DEFAULT_WORKERS, thread_name_prefix="typeconf")
+    return _EXECUTOR
+
+
+def set_executor(pool):
+    """Replaces the executor, e.g. by a pool with more threads"""
+    global _EXECUTOR
+    _EXECUTOR = pool
+    _READERS.clear()
+
+
+async def run(fn, *args, **kwargs):
+    """Runs fn in the executor"""
+    return await asyncio.get_running_loop().run_in_executor(
+        executor(), functools.partial(fn, *args, **kwargs))
+
+
+def lock(factory):
+    """Lock held while the factory is changed by an async method, one per event loop"""
+    if factory not in _LOCKS:
+        _LOCKS[factory] = weakref.WeakKeyDictionary()
+    locks = _LOCKS[factory]
+    loop = asyncio.get_running_loop()
+    if loop not in locks:
+        locks[loop] = asyncio.Lock()
+    return locks[loop]
+
+
+def read_batch(paths):
+    """Returns (cfg, None) or (None, exception) for every path"""
+    results = []
+    for path in paths:
+        try:
+            results.append((u.read_file(path), None))
+        except Exception as e:
+            results.append((None, e))
+    return results
+
+
+class BatchReader(object):
+    """
+    Collects the files requested during one iteration of the event loop
+    and reads them in at most `workers` executor jobs. Concurrent requests
+    of the same file share one read, all but the first get a copy.
+    """
+    def __init__(self, pool, workers=DEFAULT_WORKERS):
+        self.pool = pool
+        self.workers = workers
+        # path -> future of the files to read in the next batch
+        self.pending = {}
+
+    async def read(self, path):
+        future = self.pending.get(path)
+        shared = future is not None
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if len(self.pending) == 0:
+                loop.call_soon(self.flush, loop)
+            future = loop.create_future()
+            self.pending[path] = future
+        # one cancelled caller does not cancel the read of the others
+        cfg = await asyncio.shield(future)
+        if shared:
+            # the factory modifies the cfgs of templates
+            return copy.deepcopy(cfg)
+        return cfg
+
+    def flush(self, loop):
+        batch, self.pending = self.pending, {}
+        paths = list(batch)
+        size = -(-len(paths) // self.workers)
+        for start in range(0, len(paths), size):
+            chunk = paths[start:start + size]
+            job = loop.run_in_executor(self.pool, read_batch, chunk)
+            job.add_done_callback(functools.partial(self.deliver, [batch[path] for path in chunk]))
+
+    @staticmethod
+    def deliver(futures, job):
+        if job.cancelled():
+            for future in futures:
+                future.cancel()
+            return
+        if job.exception() is not None:
+            results = [(None, job.exception())] * len(futures)
+        else:
+            results = job.result()
+        for future, (cfg, error) in zip(futures, results):
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(cfg)
+
+
+def reader():
+    loop = asyncio.get_running_loop()
+    if loop not in _READERS:
+        _READERS[loop] = BatchReader(executor())
+    return _READERS[loop]
+
+
+async def read_file(path):
+    """utils.read_file in the executor, batched with concurrent reads"""
+    return await reader().read(path)
+
+
+async def read_files(paths):
+    return await asyncio.gather(*[read_file(path) for path in paths])
@@ -1,4 +1,5 @@
 import logging
+from .expression import evaluate
 
 logger = logging.getLogger()
 
@@ -6,6 +7,12 @@ MAGIC_DEFAULT_VALUE = "SC_MAGIC_DEFAULT_VALUE"
 
 
 class Attribute(object):
+    """
+    Settings of a template entry. Attributes are part of the schema,
+    the value is held by the parser instance passed to parse.
+    """
+    __slots__ = ('name', 'parser', 'required', 'default', 'help', 'eval', 'const')
+
     def __init__(
             self,
             name,
@@ -24,28 +31,42 @@ class Attribute(object):
         self.eval = evaluate
         self.const = const
 
-    def parse(self):
-        if not self.parser.isset:
+    def parse(self, parser, shallow=False, scope=None):
+        """
+        Args:
+            parser: instance of self.parser holding the value
+            shallow: only check the attribute itself, the values below
+                     a nested parser are left to be parsed on access
+            scope: values the expression of an eval attribute refers to
+        """
+        default = not parser.isset
+        if default:
             if self.required:
-                raise ValueError("Value not set %s", self.name, self.parser)
+                raise ValueError("Value not set %s", self.name, parser)
             # TODO default must be set WHAT if it wasnt set
             if self.default == MAGIC_DEFAULT_VALUE:
                 raise ValueError("Value was not set but also no default value for {}".format(self.name))
-            self.parser.value = self.default
+            parser.value = self.default
             logger.warning("Setting default value for %s to %s", self.name, self.default)
         else:
             # value was set
             if self.const:
                 # alternatively create a type
                 # allows to check if the value was changed
-                raise ValueError("{} is const, cannot set value {}".format(self.name, self.parser.value))
+                raise ValueError("{} is const, cannot set value {}".format(self.name, parser.value))
 
         if self.eval:
-            self.parser.value = eval(self.parser.value)
-        return self.parser()
+            parser.value = evaluate(parser.value, scope)
+        result = True if shallow else parser()
+        if default:
+            # a default is not a value that was set
+            parser.isset = False
+        if not shallow:
+            parser.dirty = False
+        return result
 
     def __str__(self):
-        return "{} {} {} {} {}".format(self.name, self.default, self.required, self.help, self.parser.value)
+        return "{} {} {} {}".format(self.name, self.default, self.required, self.help)
 
 
 class AttributeFactory(object):
@@ -0,0 +1,155 @@
+"""Persistent on-disk cache for parsed template files and built types"""
+import copyreg
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+
+from . import utils as u
+
+logger = logging.getLogger()
+
+# bump whenever the pickled classes change
+CACHE_VERSION = 6
+
+# class -> reducer used when types are stored, e.g. to leave out parts
+# that are cached by themselves
+TYPE_REDUCERS = {}
+
+
+def default_directory():
+    base = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'typeconf')
+
+
+def digest_file(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class FileEntry(object):
+    def __init__(self, mtime, size, digest, cfg):
+        self.mtime = mtime
+        self.size = size
+        self.digest = digest
+        self.cfg = cfg
+
+
+class TemplateCache(object):
+    """
+    Parsed template files are stored in one index per search directory
+    and are validated by mtime and size, falling back to a content hash.
+    Built types are stored under a digest of all files they were built
+    from, so a changed template only invalidates the types depending on it.
+    """
+    def __init__(self, directory=None):
+        if directory is None:
+            directory = default_directory()
+        self.directory = directory
+        # search directory -> {path: FileEntry}
+        self.indices = {}
+        self.modified = set()
+
+    def index_path(self, root):
+        key = hashlib.sha1(root.encode()).hexdigest()
+        return os.path.join(self.directory, "files-{}.pickle".format(key))
+
+    def type_path(self, key):
+        return os.path.join(self.directory, "types", "{}.pickle".format(key))
+
+    def open(self, root):
+        """Loads the index of a search directory"""
+        root = os.path.abspath(root)
+        if root in self.indices:
+            return
+        index = self.load(self.index_path(root))
+        self.indices[root] = index if index is not None else {}
+
+    def find_index(self, path):
+        # longest matching search directory
+        roots = [r for r in self.indices if path.startswith(r + os.path.sep)]
+        if len(roots) == 0:
+            raise ValueError("{} is not in a cached search directory".format(path))
+        return max(roots, key=len)
+
+    def read(self, path):
+        return self.read_many([path])[0]
+
+    def read_many(self, paths, workers=None, processes=False):
+        """
+        Args:
+            workers, processes: see utils.read_files
+
+        Returns:
+            The content of the template files and their digests.
+            Files are only parsed if their content changed.
+        """
+        entries = []
+        stale = []
+        for path in paths:
+            path = os.path.abspath(path)
+            root = self.find_index(path)
+            index = self.indices[root]
+            stat = os.stat(path)
+            entry = index.get(path)
+            if entry is None or (entry.mtime, entry.size) != (stat.st_mtime_ns, stat.st_size):
+                digest = digest_file(path)
+                if entry is None or entry.digest != digest:
+                    entry = FileEntry(stat.st_mtime_ns, stat.st_size, digest, None)
+                    stale.append((path, entry))
+                else:
+                    # only touched
+                    entry.mtime, entry.size = stat.st_mtime_ns, stat.st_size
+                index[path] = entry
+                self.modified.add(root)
+            entries.append(entry)
+
+        cfgs = u.read_files([path for path, _ in stale], workers, processes)
+        for (_, entry), cfg in zip(stale, cfgs):
+            entry.cfg = cfg
+        return [(entry.cfg, entry.digest) for entry in entries]
+
+    def load_type(self, key):
+        return self.load(self.type_path(key))
+
+    def store_type(self, key, typ):
+        self.dump(self.type_path(key), typ, TYPE_REDUCERS)
+
+    def save(self):
+        """Writes all modified indices"""
+        for root in self.modified:
+            self.dump(self.index_path(root), self.indices[root])
+        self.modified.clear()
+
+    @staticmethod
+    def load(path):
+        try:
+            with open(path, 'rb') as f:
+                version, obj = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning("Ignoring unreadable cache file %s", path, exc_info=True)
+            return None
+        if version != CACHE_VERSION:
+            return None
+        return obj
+
+    @staticmethod
+    def dump(path, obj, reducers=None):
+        # many processes might share the cache, never expose partial files
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickler = pickle.Pickler(f, pickle.HIGHEST_PROTOCOL)
+                if reducers:
+                    pickler.dispatch_table = copyreg.dispatch_table.copy()
+                    pickler.dispatch_table.update(reducers)
+                pickler.dump((CACHE_VERSION, obj))
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
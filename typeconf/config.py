@@ -1,4 +1,14 @@
 import json
+import threading
+
+
+def to_json(value):
+    """json default for the values of configs, e.g. numpy arrays"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError("{} is not JSON serializable".format(type(value).__name__))
+
+
 class Config(dict):
     """
     https://stackoverflow.com/questions/2352181/how-to-use-a-dot-to-access-members-of-dictionary
@@ -7,5 +17,201 @@ class Config(dict):
     __setattr__ = dict.__setitem__
     __delattr__ = dict.__delitem__
     def __str__(self):
-        return json.dumps(self, indent=4)
+        return json.dumps(self, indent=4, default=to_json)
+
+
+class LazyConfig(object):
+    """
+    Config whose values are validated and built on first access, see
+    ConfigTemplate.to_config(lazy=True). Values are read from the template
+    when they are first accessed, so the template should not be changed
+    while the config is in use.
+    """
+    __slots__ = ('_keys', '_resolve', '_values')
+
+    def __init__(self, keys, resolve):
+        """
+        Args:
+            keys: the keys of the config
+            resolve: called with a key, validates and returns its value
+        """
+        self._keys = tuple(keys)
+        self._resolve = resolve
+        # key -> value for the keys accessed so far
+        self._values = {}
+
+    def __getattr__(self, key):
+        if key.startswith('__'):
+            raise AttributeError(key)
+        # behaves like Config for unknown keys
+        return self.get(key)
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        if key not in self._keys:
+            raise KeyError(key)
+        value = self._resolve(key)
+        self._values[key] = value
+        return value
+
+    def get(self, key, default=None):
+        if key not in self._keys:
+            return default
+        return self[key]
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def keys(self):
+        return self._keys
+
+    def values(self):
+        return [self[key] for key in self._keys]
+
+    def items(self):
+        return [(key, self[key]) for key in self._keys]
+
+    def materialize(self):
+        """Validates all values and returns the config as Config"""
+        config = Config()
+        for key in self._keys:
+            value = self[key]
+            config[key] = value.materialize() if isinstance(value, LazyConfig) else value
+        return config
+
+    def __eq__(self, other):
+        if isinstance(other, LazyConfig):
+            other = other.materialize()
+        return self.materialize() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, ", ".join(
+            "{}={!r}".format(key, self._values[key]) if key in self._values else key
+            for key in self._keys))
+
+    def __str__(self):
+        return str(self.materialize())
+
+
+class FrozenConfig(object):
+    """
+    Base of the immutable config classes generated by frozen_class.
+    Every key is a slot, unknown keys raise an AttributeError.
+    Keys that are no identifiers are available through getattr and [].
+    """
+    # fingerprint of the config once it was computed, see fingerprint.digest
+    __slots__ = ('_digest',)
+    _fields = ()
+
+    def __init__(self, *values):
+        if len(values) != len(self._fields):
+            raise TypeError("{} expects {} values, got {}".format(
+                type(self).__name__, len(self._fields), len(values)))
+        for setter, value in zip(self._setters, values):
+            setter(self, value)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("{} is frozen, cannot set {}".format(type(self).__name__, key))
+
+    def __delattr__(self, key):
+        raise AttributeError("{} is frozen, cannot delete {}".format(type(self).__name__, key))
+
+    def __getitem__(self, key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def _values(self):
+        return tuple(getattr(self, key) for key in self._fields)
+
+    def _asdict(self):
+        """Returns the config as nested dicts"""
+        return {key: value._asdict() if isinstance(value, FrozenConfig) else value
+                for key, value in zip(self._fields, self._values())}
+
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+        try:
+            return self._values() == other._values()
+        except ValueError:
+            # numpy arrays have no truth value, compare the fingerprints
+            return self._fingerprint() == other._fingerprint()
+
+    def __hash__(self):
+        try:
+            return hash((type(self), self._values()))
+        except TypeError:
+            # read-only numpy arrays are not hashable
+            return hash((type(self), self._fingerprint()))
+
+    def _fingerprint(self):
+        from . import fingerprint
+        return fingerprint.digest(self)
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, ", ".join(
+            "{}={!r}".format(key, value) for key, value in zip(self._fields, self._values())))
+
+    def __str__(self):
+        return json.dumps(self._asdict(), indent=4, default=to_json)
+
+    def __reduce__(self):
+        return _rebuild, (type(self).__name__, self._fields, self._values())
+
+
+# (name, fields) -> class
+_FROZEN_CLASSES = {}
+_FROZEN_LOCK = threading.Lock()
+RESERVED_KEYS = {'_fields', '_setters', '_values', '_asdict', '_digest', '_fingerprint'}
+
+
+def frozen_class(name, fields):
+    """Returns the FrozenConfig subclass for the keys in fields, one class per name and fields"""
+    fields = tuple(fields)
+    cls = _FROZEN_CLASSES.get((name, fields))
+    if cls is not None:
+        return cls
+    with _FROZEN_LOCK:
+        cls = _FROZEN_CLASSES.get((name, fields))
+        if cls is None:
+            cls = _frozen_class(name, fields)
+            _FROZEN_CLASSES[(name, fields)] = cls
+        return cls
+
+
+def _frozen_class(name, fields):
+    slots = tuple("_slot{}".format(i) for i in range(len(fields)))
+    invalid = [key for key in fields if key.startswith('__') or key in RESERVED_KEYS or key in slots]
+    if len(invalid) > 0:
+        raise ValueError("{}: keys {} cannot be used in a frozen config".format(name, invalid))
+    cls = type(name, (FrozenConfig,), {'__slots__': slots, '_fields': fields})
+    cls._setters = tuple(getattr(cls, slot).__set__ for slot in slots)
+    # the slot descriptors are also available under the keys
+    for key, slot in zip(fields, slots):
+        setattr(cls, key, getattr(cls, slot))
+    return cls
+
 
+def _rebuild(name, fields, values):
+    return frozen_class(name, fields)(*values)
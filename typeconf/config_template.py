@@ -1,14 +1,90 @@
+import functools
 import logging
+import os
+import threading
 from . import utils as u
+from . import profiling as prof
+from . import fingerprint
+from .parser import ListType
+from .plan import compile_plan
+from .path_index import PathIndex
 from argparse import ArgumentParser
 
 logger = logging.getLogger()
 
+
+def synchronized(method):
+    """Runs method holding the lock of the template"""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return locked
+
+
 class ConfigTemplate(object):
-    def __init__(self, name, parser):
+    """
+    The public methods changing or reading the values hold the lock of the
+    template, so a reload by the watcher thread never interleaves with them.
+    """
+    def __init__(self, name, parser, index=None):
+        """
+        Args:
+            index: PathIndex of the parser, shared between templates
+        """
         self.name = name
         self.parser = parser
         self.argument_parser = ArgumentParser()
+        self.plan = None
+        if index is None:
+            index = PathIndex(parser)
+        self.index = index
+        # path -> instance and the OneOfTypes choosing it, see get_parser
+        self.parsers = {}
+        self.reload_callbacks = []
+        # merge.Provenance of the last fill_from_layers
+        self.provenance = None
+        self.lock = threading.RLock()
+
+    def on_reload(self, callback):
+        """callback(template) is called after the template was reloaded"""
+        self.reload_callbacks.append(callback)
+
+    @synchronized
+    def reload(self, parser, index):
+        """
+        Replaces the parser after its templates changed, see TypeFactory.refresh.
+        The values set so far are set again. If they do not fit the changed
+        templates, e.g. because a chosen subtype was removed, a ValueError
+        is raised and the template keeps its parser and values.
+        """
+        values = self.parser.raw_value()
+        if values:
+            self.check_values(index, values, ())
+            with prof.phase("fill", self.name):
+                parser.value = values
+        self.parser = parser
+        self.index = index
+        self.plan = None
+        self.parsers = {}
+        for callback in self.reload_callbacks:
+            callback(self)
+
+    def check_values(self, index, values, levels):
+        """Raises a ValueError if values hold keys that have no path in index"""
+        for key, value in values.items():
+            path = ".".join(levels + (key,))
+            if path not in index:
+                raise ValueError("{}: {} was set but is no longer in the template".format(self.name, path))
+            if isinstance(value, dict) and index.parsers[path].nested:
+                self.check_values(index, value, levels + (key,))
+
+    @synchronized
+    def reset(self):
+        """Removes all values, the template can be filled again without building it"""
+        self.parser = self.parser.instantiate()
+        self.parsers = {}
+        self.provenance = None
 
     def parse_args(self, args=None):
         args, unknown_args = self.argument_parser.parse_known_args(args)
@@ -16,27 +92,235 @@ class ConfigTemplate(object):
         return args
 
     def fill_from_file(self, path):
-        cfg = u.read_file(path)
+        with prof.phase("read_config", self.name):
+            cfg = u.read_file(path)
         return self.fill_from_cfg(cfg)
 
-    # TODO Think about grid search
-    def fill_from_cl(self, unknown_args):
+    @synchronized
+    def fill_from_layers(self, layers, args=None):
+        """
+        Fills the template once from several configs, later ones override
+        earlier ones, see merge.merge.
+
+        Args:
+            layers: paths of config files, dicts or (name, cfg)
+            args: command line overrides path=value, applied last
+
+        Returns:
+            The merge.Provenance of the values, see source
+        """
+        from .merge import merge
+        named = []
+        for pos, layer in enumerate(layers):
+            if isinstance(layer, str):
+                with prof.phase("read_config", self.name):
+                    named.append((layer, u.read_file(layer)))
+            elif isinstance(layer, dict):
+                named.append(("layer{}".format(pos), layer))
+            else:
+                named.append(tuple(layer))
+        if args:
+            overrides = self.split_args(args)
+            self.index.check([path for path, _ in overrides])
+            cfg = {}
+            for path, value in overrides:
+                levels, choices = self.index.resolve(path)
+                cfg = u.replace_path(cfg, levels, value, choices)
+            named.append(("command line", cfg))
+        with prof.phase("merge", self.name):
+            cfg, self.provenance = merge(named, self.parser)
+        self.fill_from_cfg(cfg)
+        return self.provenance
+
+    @synchronized
+    def source(self, path):
+        """
+        Returns:
+            The name of the layer the value at path was taken from, None
+            if no layer set it and the default of the template is used
+        """
+        if self.provenance is None:
+            raise ValueError("{} was not filled from layers".format(self.name))
+        levels, _ = self.index.resolve(path)
+        return self.provenance.source(levels)
+
+    async def afill_from_file(self, path):
+        """fill_from_file reading the file in the executor of aio"""
+        from . import aio
+        with prof.phase("read_config", self.name):
+            cfg = await aio.read_file(path)
+        # reload holds the lock of the template while it rebuilds
+        return await aio.run(self.fill_from_cfg, cfg)
+
+    @staticmethod
+    def split_args(unknown_args):
+        overrides = []
         for arg in unknown_args:
             path, sep, value = arg.partition("=")
-            # could be split
-            if sep == '=':
-                nested = u.dot2dict(path, value)
-                self.parser.value = nested
-            else:
-                raise ValueError
-        return
+            if sep != '=':
+                raise ValueError("Expected path=value, got {}".format(arg))
+            overrides.append((path, value))
+        return overrides
+
+    def fill_from_cl(self, unknown_args):
+        self.update(self.split_args(unknown_args))
+
+    def fill_from_env(self, prefix="TYPECONF_", environ=None):
+        """
+        Sets values from environment variables, levels are separated
+        by two underscores: TYPECONF_attr_child__attr_bool=False
+        The variables of the library itself, TYPECONF_PROFILE, are skipped.
+        """
+        if environ is None:
+            environ = os.environ
+        self.update((key[len(prefix):].replace('__', '.'), value)
+                    for key, value in environ.items()
+                    if key.startswith(prefix) and key != prof.ENVIRON_VARIABLE)
+
+    @synchronized
+    def update(self, overrides):
+        """
+        Sets values by their dot separated path.
+        All paths are checked before any value is set.
+
+        Args:
+            overrides: dict or iterable of (path, value)
+        """
+        if isinstance(overrides, dict):
+            overrides = overrides.items()
+        overrides = list(overrides)
+        with prof.phase("update", self.name):
+            self.index.check([path for path, _ in overrides])
+            for path, value in overrides:
+                self.get_parser(path).value = value
+
+    @synchronized
+    def get_parser(self, path):
+        """
+        Returns:
+            The instance at path. All levels above are marked as set
+            and the subtypes along the path are chosen.
+        """
+        entry = self.parsers.get(path)
+        if entry is None:
+            levels, choices = self.index.resolve(path)
+            parser = self.parser
+            selections = []
+            for pos, key in enumerate(levels):
+                if pos in choices:
+                    selections.append((parser, key))
+                    parser = parser.select(key)
+                else:
+                    parser.isset = True
+                    parser = parser.get_parser(key)
+            entry = (parser, selections)
+            self.parsers[path] = entry
 
+        parser, selections = entry
+        for choice, key in selections:
+            choice.select(key)
+        return parser
+
+    def sweep(self, unknown_args):
+        """
+        Yields a validated config for every combination of swept values,
+        starting from the values filled so far. The template is not modified.
+        Values are swept with lists or ranges, other arguments are fixed:
+            lr=[0.1,0.01] epochs=range(10,40,10) model.name=resnet
+        List attributes are swept with a list of lists, see utils.parse_sweep:
+            weights=[[1,2],[3,4]] sweeps two lists, weights=[1,2] is fixed
+        """
+        overrides = self.split_args(unknown_args)
+        with self.lock:
+            self.index.check([path for path, _ in overrides])
+            cfg = self.parser.raw_value()
+            axes = []
+            for path, value in overrides:
+                levels, choices = self.index.resolve(path)
+                values = u.parse_sweep(value, self.list_dimensions(path))
+                if values is None:
+                    cfg = u.replace_path(cfg, levels, value, choices)
+                else:
+                    axes.append((levels, choices, values))
+            run = self.compile().run
+        for combination in u.iter_product([values for _, _, values in axes]):
+            variant = cfg
+            for (levels, choices, _), value in zip(axes, combination):
+                # values are passed like all other command line values
+                variant = u.replace_path(variant, levels, str(value), choices)
+            yield run(variant)
+
+    def list_dimensions(self, path):
+        parser = self.index.parsers[path]
+        return len(parser.shape) if isinstance(parser, ListType) else 0
+
+    @synchronized
     def fill_from_cfg(self, cfg):
-        self.parser.value = cfg
+        with prof.phase("fill", self.name):
+            self.parser.value = cfg
+
+    @synchronized
+    def to_config(self, frozen=False, lazy=False):
+        """
+        Args:
+            frozen: return immutable configs with a fixed set of keys,
+                    see config.FrozenConfig
+            lazy: return a config.LazyConfig validating nested configs on
+                  first access, materialize() validates the rest
+        """
+        if lazy:
+            if frozen:
+                raise ValueError("Lazy configs cannot be frozen")
+            return self.parser.to_config(lazy=True)
+        with prof.phase("parse", self.name):
+            self.parser.parse()
+        with prof.phase("to_config", self.name):
+            return self.parser.to_config(frozen)
+
+    @synchronized
+    def fingerprint(self):
+        """
+        Returns:
+            The hex digest of to_config(), see fingerprint.digest. Only the
+            values changed since the last call are hashed again.
+        """
+        with prof.phase("parse", self.name):
+            self.parser.parse()
+        with prof.phase("fingerprint", self.name):
+            return fingerprint.to_digest(self.parser.fingerprint()).hex()
+
+    @synchronized
+    def compile(self):
+        """Returns the validation plan of this template, see validate"""
+        if self.plan is None:
+            with prof.phase("compile", self.name):
+                self.plan = compile_plan(self.parser)
+        return self.plan
+
+    def validate(self, cfg):
+        """
+        Validates cfg against the template without filling it.
 
-    def to_config(self):
-        self.parser.parse()
-        return self.parser.to_config()
+        Returns:
+            The Config as returned by to_config
+        """
+        run = self.compile().run
+        prof.count("configs_validated")
+        with prof.phase("validate", self.name):
+            return run(cfg)
 
+    def validate_many(self, cfgs):
+        run = self.compile().run
+        cfgs = list(cfgs)
+        prof.count("configs_validated", len(cfgs))
+        with prof.phase("validate", self.name):
+            return [run(cfg) for cfg in cfgs]
 
+    async def avalidate(self, cfg):
+        """validate in the executor of aio"""
+        from . import aio
+        return await aio.run(self.validate, cfg)
 
+    async def avalidate_many(self, cfgs):
+        from . import aio
+        return await aio.run(self.validate_many, cfgs)
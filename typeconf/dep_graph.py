@@ -1,3 +1,6 @@
+from . import profiling as prof
+
+
 class OrderedSet(dict):
     def add(self, elem):
         self[elem] = None
@@ -7,12 +10,75 @@ class OrderedSet(dict):
             self.add(e)
 
 
+class Order(object):
+    """
+    Resolved dependency order of one type, built on first use. The orders of
+    all types of one search share its postorder, so storing them is cheap.
+    The order is the orders of the types resolved before, then the part of
+    the postorder finished while the type was resolved, without duplicates.
+    """
+    __slots__ = ('parts', 'finished', 'start', 'end', 'items')
+
+    def __init__(self, parts, finished, start, end):
+        """
+        Args:
+            parts: (order, name) of a type resolved before, name None for
+                   only the parts of order
+        """
+        self.parts = parts
+        self.finished = finished
+        self.start = start
+        self.end = end
+        self.items = None
+
+    def materialize(self):
+        if self.items is None:
+            items = OrderedSet()
+            # explicit stack, parts can be nested deeply
+            todo = [('full', self)]
+            while todo:
+                kind, entry = todo.pop()
+                if kind == 'name':
+                    items.add(entry)
+                elif kind == 'slice':
+                    items.union(entry.finished[entry.start:entry.end])
+                elif kind == 'full' and entry.items is not None:
+                    items.union(entry.items)
+                else:
+                    if kind == 'full':
+                        todo.append(('slice', entry))
+                    for part, name in reversed(entry.parts):
+                        if name is None:
+                            todo.append(('parts', part))
+                        else:
+                            todo.append(('name', name))
+                            todo.append(('full', part))
+            self.items = tuple(items)
+        return self.items
+
+    def __iter__(self):
+        return iter(self.materialize())
+
+    def __len__(self):
+        return len(self.materialize())
+
+    def __contains__(self, name):
+        return name in self.materialize()
+
+    def __repr__(self):
+        return "Order({})".format(list(self))
+
+
 class TypeNode(object):
-    def __init__(self, name, cfg=None, dependency_list=set()):
+    __slots__ = ('name', 'cfg', 'dependency_list')
+
+    def __init__(self, name, cfg=None, dependency_list=None):
         """
         Args:
         dependencies: list of DependencyNodes
         """
+        if dependency_list is None:
+            dependency_list = set()
         self.dependency_list = dependency_list
         self.name = name
         self.cfg = cfg
@@ -21,9 +87,29 @@ class TypeNode(object):
 class DependencyGraph(object):
     def __init__(self):
         self.types = {}
+        # name -> names of the types directly depending on it
+        self.dependents = {}
+        # name -> resolved dependency order
+        self.orders = {}
+        # name -> resolved dependency order without the dependencies of folders
+        self.shallow_orders = {}
 
     def add_node(self, node):
+        old = self.types.get(node.name)
+        if old is not None:
+            for dep in old.dependency_list:
+                self.dependents[dep].discard(node.name)
+        for dep in node.dependency_list:
+            self.dependents.setdefault(dep, set()).add(node.name)
         self.types[node.name] = node
+        self.invalidate(node.name)
+
+    def remove_node(self, name):
+        """Types depending on name stay in the graph and can no longer be resolved"""
+        node = self.types.pop(name)
+        for dep in node.dependency_list:
+            self.dependents[dep].discard(name)
+        self.invalidate(name)
 
     def add(self, *args, **kwargs):
         self.add_node(TypeNode(*args, **kwargs))
@@ -31,31 +117,98 @@ class DependencyGraph(object):
     def get_node(self, name):
         return self.types[name]
 
-    def get_dep_order(self, name, parents=set()):
-        # we need a unique copy for this level
-        parents = parents.copy()
-        if name not in self.types:
-            raise ValueError("Unknown type {}. Required by one of {}".format(name, parents))
-        node = self.types[name]
-
-        if name in parents:
-            raise ValueError("Cycle", name, parents)
+    def get_dependents(self, name):
+        """Returns all types that depend directly or indirectly on name"""
+        dependents = set()
+        stack = [name]
+        while stack:
+            for dependent in self.dependents.get(stack.pop(), ()):
+                if dependent not in dependents:
+                    dependents.add(dependent)
+                    stack.append(dependent)
+        return dependents
+
+    def invalidate(self, name):
+        """Drops the resolved orders that contain name"""
+        if not self.orders and not self.shallow_orders:
+            # e.g. while templates are registered
+            return
+        for orders in (self.orders, self.shallow_orders):
+            orders.pop(name, None)
+            for dependent in self.get_dependents(name):
+                orders.pop(dependent, None)
+
+    def get_dep_order(self, name, folders=True):
+        """
+        Args:
+            folders: include the dependencies of folders, i.e. of nodes without a cfg.
+                     Cycles through folders are not detected otherwise.
 
-        parents.add(name)
-        ordered_deps = OrderedSet()
-        for dep in node.dependency_list:
-            ordered_deps.union(self.get_dep_order(dep, parents))
+        Returns:
+            All dependencies of name, every type after its own dependencies.
+            The result is cached and must not be modified.
+        """
+        orders = self.orders if folders else self.shallow_orders
+        if name in orders:
+            return orders[name]
+        if name not in self.types:
+            raise ValueError("Unknown type {}".format(name))
+        with prof.phase("dep_order", name):
+            return self.resolve_order(name, folders)
 
-        ordered_deps.union(node.dependency_list)
-        return ordered_deps
+    def dependencies(self, name, folders):
+        node = self.types[name]
+        if not folders and node.cfg is None:
+            return iter(())
+        return iter(node.dependency_list)
+
+    def resolve_order(self, name, folders=True):
+        """Resolves and stores the order of name and of every type finished on the way"""
+        orders = self.orders if folders else self.shallow_orders
+        # postorder of the types finished by this search, shared by their orders
+        finished = []
+        # iterative depth first search, path holds the types being resolved
+        # and frames where their part of finished starts and their parts
+        path = [name]
+        on_path = {name}
+        frames = [(0, [])]
+        stack = [self.dependencies(name, folders)]
+        while stack:
+            dep = next(stack[-1], None)
+            if dep is None:
+                stack.pop()
+                done = path.pop()
+                on_path.discard(done)
+                start, parts = frames.pop()
+                order = Order(parts, finished, start, len(finished))
+                orders[done] = order
+                finished.append(done)
+                if len(path) > 0 and len(parts) > 0:
+                    # types finished before done, reached through it
+                    frames[-1][1].append((order, None))
+                continue
+            if dep in on_path:
+                cycle = path[path.index(dep):] + [dep]
+                raise ValueError("Cycle {}".format(" -> ".join(cycle)))
+            if dep not in self.types:
+                raise ValueError("Unknown type {}. Required by {}".format(dep, " -> ".join(path)))
+            if dep in orders:
+                # already resolved, its order followed by itself
+                frames[-1][1].append((orders[dep], dep))
+                continue
+            path.append(dep)
+            on_path.add(dep)
+            frames.append((len(finished), []))
+            stack.append(self.dependencies(dep, folders))
+        return orders[name]
 
 
 if __name__ == "__main__":
     graph = DependencyGraph()
-    node1 = TypeNode("a", ["b", "c", "d"])
-    node2 = TypeNode("b", ["c"])
-    node3 = TypeNode("c", ["d"])
-    node4 = TypeNode("d", ["b"])
+    node1 = TypeNode("a", dependency_list=["b", "c", "d"])
+    node2 = TypeNode("b", dependency_list=["c"])
+    node3 = TypeNode("c", dependency_list=["d"])
+    node4 = TypeNode("d", dependency_list=["b"])
 
     graph.add_node(node1)
     graph.add_node(node2)
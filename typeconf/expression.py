@@ -0,0 +1,106 @@
+"""
+Expressions of eval attributes.
+
+Every expression is compiled once and evaluated with a restricted set of
+builtins. Names refer to the other attributes of the same template, nested
+values are reached by dot path, e.g.
+
+    hidden:
+        eval: True
+        default: "model.width * 4"
+"""
+import ast
+import builtins
+import functools
+
+SAFE_BUILTINS = {name: getattr(builtins, name) for name in (
+    'abs', 'all', 'any', 'bool', 'dict', 'divmod', 'float', 'int', 'len', 'list',
+    'max', 'min', 'pow', 'range', 'round', 'set', 'sorted', 'str', 'sum', 'tuple', 'zip')}
+
+_GLOBALS = {'__builtins__': SAFE_BUILTINS}
+
+# expressions can come from the command line or submitted configs,
+# only the most recently used ones are kept
+CACHE_SIZE = 4096
+
+
+class Expression(object):
+    __slots__ = ('source', 'code', 'names')
+
+    def __init__(self, source):
+        self.source = source
+        try:
+            tree = ast.parse(source.strip(), mode='eval')
+        except SyntaxError as e:
+            raise ValueError("Invalid expression {!r}: {}".format(source, e.msg))
+        names = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Attribute) and node.attr.startswith('_'):
+                raise ValueError("Invalid expression {!r}: {} is private".format(source, node.attr))
+            if isinstance(node, ast.Name):
+                if node.id.startswith('__'):
+                    raise ValueError("Invalid expression {!r}: {} is private".format(source, node.id))
+                names.add(node.id)
+        # names of values the expression refers to
+        self.names = frozenset(names)
+        self.code = compile(tree, '<expression>', 'eval')
+
+    def __call__(self, scope=None):
+        """
+        Args:
+            scope: mapping of the names the expression refers to
+        """
+        return eval(self.code, _GLOBALS, {} if scope is None else scope)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(source):
+    """Returns the Expression for source, compiled once per source while it is in use"""
+    return Expression(source)
+
+
+def evaluate(value, scope=None):
+    """Evaluates value if it is an expression, other values are already evaluated"""
+    if not isinstance(value, str):
+        return value
+    return compile_expression(value)(scope)
+
+
+def references(value, names):
+    """Returns the names of `names` the expression value refers to"""
+    if not isinstance(value, str):
+        return ()
+    return [name for name in compile_expression(value).names if name in names]
+
+
+def evaluation_order(dependencies):
+    """
+    Args:
+        dependencies: key -> keys that have to be evaluated before,
+                      keys without an entry are ignored
+
+    Returns:
+        The keys in an order where every key comes after its dependencies
+    """
+    order = []
+    done = set()
+    for root in dependencies:
+        if root in done:
+            continue
+        path = [root]
+        stack = [iter(dependencies[root])]
+        while stack:
+            key = next(stack[-1], None)
+            if key is None:
+                stack.pop()
+                done.add(path[-1])
+                order.append(path.pop())
+                continue
+            if key in done or key not in dependencies:
+                continue
+            if key in path:
+                cycle = path[path.index(key):] + [key]
+                raise ValueError("Cycle in expressions {}".format(" -> ".join(cycle)))
+            path.append(key)
+            stack.append(iter(dependencies[key]))
+    return order
@@ -17,6 +17,13 @@ class FileTree(object):
             level = level[s]
         level[structure[-1]] = name
 
+    def remove(self, structure):
+        """Removes the file structure[-1], empty folders are kept"""
+        level = self.nested
+        for s in structure[:-1]:
+            level = level[s]
+        del level[structure[-1]]
+
     def get(self, structure):
         """
         Args:
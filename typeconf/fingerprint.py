@@ -0,0 +1,184 @@
+"""
+Canonical structural hashes of configs, e.g. to key result caches or to
+find duplicate runs of a sweep.
+
+Configs holding the same values have the same fingerprint, independent of
+the order of their keys and of whether they are a Config, a FrozenConfig,
+a LazyConfig or a SnapshotConfig. Lists and tuples are hashed alike, ints
+and floats are not. Leaves other than None, bools, numbers, strings, bytes
+and numpy arrays raise a TypeError.
+
+    fingerprint.hexdigest(template.to_config())
+    template.fingerprint()  # the same, but only hashes what changed
+    fingerprint.diff(old, new)  # [('model.width', 64, 128)]
+
+Frozen configs and filled templates keep the digests of their subtrees,
+so after an override only the digests along its path are computed again.
+"""
+import functools
+import hashlib
+import struct
+
+from .config import FrozenConfig, LazyConfig
+from .snapshot import SnapshotConfig
+
+DIGEST_SIZE = 16
+U32 = struct.Struct('<I')
+
+# a key missing on one side of a diff
+MISSING = object()
+
+
+def new():
+    return hashlib.blake2b(digest_size=DIGEST_SIZE)
+
+
+def frame(tag, payload):
+    return tag + U32.pack(len(payload)) + payload
+
+
+def encode_leaf(value):
+    """
+    Returns:
+        The canonical bytes of a value that is no mapping or list, numpy
+        arrays and scalars included. Other types raise a TypeError.
+    """
+    if value is None:
+        return b'n'
+    if value is True:
+        return b't'
+    if value is False:
+        return b'f'
+    if isinstance(value, int):
+        return frame(b'i', int.__repr__(value).encode())
+    if isinstance(value, float):
+        # also for subclasses like numpy.float64
+        return frame(b'd', float.__repr__(value).encode())
+    if isinstance(value, str):
+        return frame(b's', value.encode())
+    if isinstance(value, bytes):
+        return frame(b'y', value)
+    if hasattr(value, 'dtype') and hasattr(value, 'tobytes'):
+        # numpy arrays
+        return frame(b'a', "{}{}".format(value.dtype.str, value.shape).encode() + value.tobytes())
+    # a repr can hold memory addresses and differ between runs
+    raise TypeError("Cannot fingerprint values of type {}".format(type(value).__name__))
+
+
+@functools.lru_cache(maxsize=4096)
+def encode_key(key):
+    # configs repeat the same keys
+    return encode_leaf(key)
+
+
+def mapping_digest(items):
+    """
+    Args:
+        items: (key, encoded value) in any order
+    """
+    h = new()
+    h.update(b'm' + U32.pack(len(items)))
+    for key, encoded in sorted((encode_key(key), encoded) for key, encoded in items):
+        h.update(key)
+        h.update(encoded)
+    return h.digest()
+
+
+def sequence_digest(encoded):
+    h = new()
+    h.update(b'l' + U32.pack(len(encoded)))
+    for item in encoded:
+        h.update(item)
+    return h.digest()
+
+
+def is_mapping(value):
+    return isinstance(value, (dict, FrozenConfig, LazyConfig, SnapshotConfig))
+
+
+def items(value):
+    if isinstance(value, FrozenConfig):
+        return zip(value._fields, value._values())
+    return value.items()
+
+
+def encode(value, memo=None):
+    """
+    Returns:
+        The canonical bytes of a leaf, b'h' and the digest of a mapping or list
+
+    Args:
+        memo: id -> (value, encoded) of the mappings and lists hashed so far,
+              shared between calls on configs with common subtrees
+    """
+    if isinstance(value, FrozenConfig):
+        # frozen configs cannot change, their digest is kept
+        cached = getattr(value, '_digest', None)
+        if cached is not None:
+            return b'h' + cached
+    elif not isinstance(value, (list, tuple)) and not is_mapping(value):
+        return encode_leaf(value)
+    if memo is None:
+        memo = {}
+    entry = memo.get(id(value))
+    if entry is not None:
+        return entry[1]
+    if isinstance(value, (list, tuple)):
+        result = sequence_digest([encode(item, memo) for item in value])
+    else:
+        result = mapping_digest([(key, encode(item, memo)) for key, item in items(value)])
+    if isinstance(value, FrozenConfig):
+        FrozenConfig._digest.__set__(value, result)
+    encoded = b'h' + result
+    # keeps value alive, so its id is not reused while memo is in use
+    memo[id(value)] = (value, encoded)
+    return encoded
+
+
+def to_digest(encoded):
+    """Returns the digest of the result of encode"""
+    if encoded[:1] == b'h':
+        return encoded[1:]
+    h = new()
+    h.update(encoded)
+    return h.digest()
+
+
+def digest(value, memo=None):
+    """Returns the fingerprint of value as bytes"""
+    return to_digest(encode(value, memo))
+
+
+def hexdigest(value):
+    return digest(value).hex()
+
+
+def diff(a, b, memo=None):
+    """
+    Compares two configs. Subtrees that are the same object or have the same
+    digest are skipped without looking at their values.
+
+    Returns:
+        (path, value in a, value in b) of every differing value, MISSING for
+        keys only one config has. Lists are compared as a whole.
+    """
+    if memo is None:
+        memo = {}
+    changes = []
+    compare(a, b, (), changes, memo)
+    return changes
+
+
+def compare(a, b, levels, changes, memo):
+    if a is b:
+        return
+    if is_mapping(a) and is_mapping(b):
+        if encode(a, memo) == encode(b, memo):
+            return
+        values_a = dict(items(a))
+        values_b = dict(items(b))
+        for key in list(values_a) + [key for key in values_b if key not in values_a]:
+            compare(values_a.get(key, MISSING), values_b.get(key, MISSING), levels + (key,), changes, memo)
+        return
+    if a is MISSING or b is MISSING or encode(a, memo) != encode(b, memo):
+        changes.append((".".join(str(level) for level in levels), a, b))
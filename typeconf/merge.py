@@ -0,0 +1,102 @@
+"""
+Merging of config layers, e.g. a base, a site and an experiment config.
+
+Later layers override the values of earlier ones. Only the dicts along the
+overridden paths are copied, everything else is shared with the layers,
+so merging costs as much as the overrides and not as the base config.
+"""
+from .type_factory import CompositeType, OneOfType
+
+
+class Provenance(object):
+    """
+    Records which layer supplied the values of a merged config.
+    Only overridden paths are stored, all other values of the merged
+    config are from the first layer.
+    """
+    def __init__(self, base):
+        self.base = base
+        # levels -> name of the layer
+        self.sources = {}
+        # the merged config, values missing in it were set by no layer
+        self.merged = {}
+
+    def record(self, levels, name, subtree=False):
+        """
+        The value at levels and everything below it comes from layer name
+
+        Args:
+            subtree: a mapping was replaced, deeper records are dropped
+        """
+        if subtree:
+            stale = [other for other in self.sources
+                     if len(other) > len(levels) and other[:len(levels)] == levels]
+            for other in stale:
+                del self.sources[other]
+        self.sources[levels] = name
+
+    def source(self, levels):
+        """
+        Returns:
+            The name of the layer the value at levels was taken from,
+            None if no layer set it, e.g. for defaults of the template
+        """
+        levels = tuple(levels)
+        value = self.merged
+        for key in levels:
+            if not isinstance(value, dict):
+                # below a value that replaced a mapping
+                break
+            if key not in value:
+                return None
+            value = value[key]
+        for end in range(len(levels), 0, -1):
+            name = self.sources.get(levels[:end])
+            if name is not None:
+                return name
+        return self.base
+
+
+def child(parser, key):
+    """Returns the schema of key in parser, None if it is unknown"""
+    if isinstance(parser, CompositeType):
+        attribute = parser.attributes.get(key)
+        return None if attribute is None else attribute.parser
+    if isinstance(parser, OneOfType):
+        return parser.subtypes.get(key)
+    return None
+
+
+def merge(layers, parser=None):
+    """
+    Args:
+        layers: list of (name, cfg), later layers override earlier ones
+        parser: schema of the configs. Choosing another subtype of a
+                OneOfType replaces the values of the previous choice.
+
+    Returns:
+        The merged cfg and its Provenance. The layers are not modified.
+    """
+    if len(layers) == 0:
+        return {}, Provenance(None)
+    base_name, merged = layers[0]
+    provenance = Provenance(base_name)
+    for name, layer in layers[1:]:
+        merged = merge_layer(merged, layer, (), parser, name, provenance)
+    provenance.merged = merged
+    return merged, provenance
+
+
+def merge_layer(base, layer, levels, parser, name, provenance):
+    merged = dict(base)
+    for key, value in layer.items():
+        sub = child(parser, key)
+        old = merged.get(key)
+        path = levels + (key,)
+        if isinstance(value, dict) and isinstance(old, dict) and not (
+                isinstance(sub, OneOfType) and set(value) != set(old)):
+            merged[key] = merge_layer(old, value, path, sub, name, provenance)
+        else:
+            merged[key] = value
+            provenance.record(path, name, isinstance(old, dict))
+    return merged
@@ -1,4 +1,34 @@
+import json
+
+from . import fingerprint
+
+# class -> names of all slots
+_SLOTS = {}
+
+
+def slot_names(cls):
+    if cls not in _SLOTS:
+        names = []
+        for klass in reversed(cls.__mro__):
+            names.extend(klass.__dict__.get('__slots__', ()))
+        _SLOTS[cls] = tuple(names)
+    return _SLOTS[cls]
+
+
 class Parser(object):
+    """
+    Parsers built by the TypeFactory are a shared schema and are never
+    filled themselves. Values are set on the containers returned by
+    instantiate.
+
+    Instances are dirty until they are parsed and again once a value
+    below them changes, see touch.
+    Subclasses should declare __slots__ to keep instances small.
+    """
+    __slots__ = ('name', '_value', 'isset', 'dirty', 'parent', 'config', 'digest')
+    # parsers holding other parsers, validated per key by lazy configs
+    nested = False
+
     @property
     def value(self):
         return self._value
@@ -7,34 +37,96 @@ class Parser(object):
     def value(self, value):
         self._value = value
         self.isset = True
+        self.touch()
 
     def __init__(self, name):
         self.name = name
         self._value = None
         self.isset = False
+        self.dirty = True
+        # instance containing this one
+        self.parent = None
+        # result of to_config(frozen=True) while not dirty
+        self.config = None
+        # fingerprint.encode of the value while not dirty
+        self.digest = None
+
+    def touch(self):
+        """Marks this instance and all containing ones for parsing"""
+        self.dirty = True
+        self.config = None
+        self.digest = None
+        node = self.parent
+        # containers of a dirty instance are dirty already
+        while node is not None and not node.dirty:
+            node.dirty = True
+            node.config = None
+            node.digest = None
+            node = node.parent
 
     def __call__(self):
         return self.parse()
 
+    def raw_value(self):
+        """Returns the value as it was set, with nested values as dicts"""
+        return self.value
+
+    def instantiate(self):
+        """Returns an empty value container sharing the schema of this parser"""
+        cls = type(self)
+        instance = cls.__new__(cls)
+        for name in slot_names(cls):
+            setattr(instance, name, getattr(self, name))
+        if hasattr(self, '__dict__'):
+            # subclass without slots
+            instance.__dict__.update(self.__dict__)
+        instance._value = None
+        instance.isset = False
+        instance.dirty = True
+        instance.parent = None
+        instance.config = None
+        instance.digest = None
+        return instance
+
     def parse(self):
+        self.value = self.coerce(self.value)
+        return True
+
+    def coerce(self, value):
+        """
+        Returns:
+            The parsed value, without changing the state of the parser
+        """
         raise NotImplementedError()
 
-    def to_config(self):
+    def to_config(self, frozen=False, lazy=False):
         return self.value
 
+    def fingerprint(self):
+        """Returns fingerprint.encode(self.to_config()), the instance must be parsed"""
+        if self.digest is not None:
+            return self.digest
+        encoded = fingerprint.encode(self.value)
+        if not self.dirty:
+            self.digest = encoded
+        return encoded
+
 
 class IntType(Parser):
-    def parse(self):
-        if isinstance(self.value, int):
-            return True
+    __slots__ = ()
+
+    def coerce(self, value):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
         # TODO better check for string
-        if isinstance(self.value, str) and self.value.isdigit():
-            self.value = int(self.value)
-            return True
+        if isinstance(value, str) and value.isdigit():
+            return int(value)
         raise ValueError("Expected Int")
 
 
 class FloatType(Parser):
+    __slots__ = ()
+
     @staticmethod
     def isfloat(value):
         try:
@@ -43,34 +135,36 @@ class FloatType(Parser):
         except ValueError:
             return False
 
-    def parse(self):
-        if isinstance(self.value, float):
-            return True
-        if isinstance(self.value, str) and self.isfloat(self.value):
-            self.value = float(self.value)
-            return True
+    def coerce(self, value):
+        if isinstance(value, float):
+            return value
+        if isinstance(value, str) and self.isfloat(value):
+            return float(value)
         raise ValueError("Expected Float")
 
 
 class BoolType(Parser):
-    def parse(self):
-        if isinstance(self.value, bool):
-            return True
-        if self.value.lower() == "false":
-            self.value = False
-            return True
-        if self.value.lower() == "true":
-            self.value = True
-            return True
+    __slots__ = ()
+
+    def coerce(self, value):
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str):
+            if value.lower() == "false":
+                return False
+            if value.lower() == "true":
+                return True
 
         raise ValueError("Expected Boolean")
 
 
 class StringType(Parser):
-    def parse(self):
-        if not isinstance(self.value, str):
+    __slots__ = ()
+
+    def coerce(self, value):
+        if not isinstance(value, str):
             raise ValueError("Expected String")
-        return True
+        return value
 
 
 BASE_TYPES = {
@@ -80,8 +174,168 @@ BASE_TYPES = {
     'string': StringType
 }
 
+# lists at least this long are validated by numpy if it is installed
+VECTORIZE_MIN = 64
+
+_NUMPY = []
+
+# element type -> numpy kinds accepted and the dtype of the array
+NUMERIC_KINDS = {
+    IntType: ('iu', 'int64'),
+    FloatType: ('iuf', 'float64'),
+    BoolType: ('b', 'bool'),
+}
+
+
+def numpy():
+    """Returns the numpy module, None if it is not installed"""
+    if not _NUMPY:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _NUMPY.append(numpy)
+    return _NUMPY[0]
+
+
+def has_bools(value):
+    """If nested lists hold a bool"""
+    types = set(map(type, value))
+    if bool in types:
+        return True
+    if list in types or tuple in types:
+        return any(has_bools(item) for item in value if isinstance(item, (list, tuple)))
+    return False
+
+
+def as_tuples(value):
+    """Returns nested lists as nested tuples"""
+    if isinstance(value, list):
+        return tuple(as_tuples(item) for item in value)
+    return value
+
 
-# class list
-# class listoftype
-# class of nestedtype
-# class of regex
+def copy_lists(value):
+    """Returns a copy of nested lists, so changes do not reach the template"""
+    if isinstance(value, list):
+        return [copy_lists(item) for item in value]
+    return value
+
+
+class ListType(Parser):
+    """
+    List of values of a base type, `dtype: list<float>`, or a numeric array
+    with an optional shape and range, `type: array`.
+
+    Long numeric lists are checked and converted in one numpy pass. A list
+    of ints is also accepted as floats. Both passes reject bools in int and
+    float lists.
+    """
+    __slots__ = ('element', 'shape', 'low', 'high', 'ndarray')
+
+    def __init__(self, name, element, shape=None, low=None, high=None, ndarray=False):
+        """
+        Args:
+            element: parser of the items
+            shape: length of every dimension, None for any length, default one dimension
+            low, high: inclusive range of the items
+            ndarray: the value is a read-only numpy array instead of nested lists
+        """
+        super().__init__(name)
+        self.element = element
+        self.shape = (None,) if shape is None else tuple(shape)
+        self.low = low
+        self.high = high
+        self.ndarray = ndarray
+        if ndarray and numpy() is None:
+            raise ValueError("{}: ndarray values require numpy".format(name))
+
+    def __str__(self):
+        return "list<{}>".format(self.element.name)
+
+    def coerce(self, value):
+        if isinstance(value, str) and value.lstrip().startswith('['):
+            # from the command line
+            value = json.loads(value)
+        np = numpy()
+        if np is not None and (self.ndarray or isinstance(value, np.ndarray) or
+                               (isinstance(value, (list, tuple)) and len(value) >= VECTORIZE_MIN)):
+            array = self.coerce_array(np, value)
+            if array is not None:
+                if self.ndarray:
+                    return array
+                return array.tolist()
+        if not isinstance(value, (list, tuple)):
+            raise ValueError("{}: Expected a list, got {}".format(self.name, value))
+        items = self.coerce_items(value, 0, [None] * len(self.shape))
+        if self.ndarray:
+            return self.coerce_array(np, items)
+        return items
+
+    def to_config(self, frozen=False, lazy=False):
+        if isinstance(self.value, list):
+            # frozen configs are hashable, arrays are read-only already
+            return as_tuples(self.value) if frozen else copy_lists(self.value)
+        return self.value
+
+    def coerce_items(self, value, dim, lengths):
+        """Validates the nested lists item by item"""
+        if not isinstance(value, (list, tuple)):
+            raise ValueError("{}: Expected {} nested lists".format(self.name, len(self.shape)))
+        self.check_length(dim, len(value), lengths)
+        if dim + 1 < len(self.shape):
+            return [self.coerce_items(item, dim + 1, lengths) for item in value]
+        items = [self.coerce_item(item) for item in value]
+        for item in items:
+            if self.low is not None and item < self.low or self.high is not None and item > self.high:
+                raise ValueError("{}: {} is not in [{}, {}]".format(self.name, item, self.low, self.high))
+        return items
+
+    def coerce_item(self, item):
+        if isinstance(self.element, FloatType) and isinstance(item, int) and not isinstance(item, bool):
+            return float(item)
+        return self.element.coerce(item)
+
+    def check_length(self, dim, length, lengths):
+        expected = self.shape[dim] if lengths[dim] is None else lengths[dim]
+        if expected is not None and length != expected:
+            raise ValueError("{}: Expected length {} in dimension {}, got {}".format(
+                self.name, expected, dim, length))
+        lengths[dim] = length
+
+    def coerce_array(self, np, value):
+        """
+        Returns:
+            The validated array, None if the items are not all numbers
+        """
+        if type(self.element) not in NUMERIC_KINDS:
+            return None
+        kinds, dtype = NUMERIC_KINDS[type(self.element)]
+        if 'b' not in kinds and isinstance(value, (list, tuple)) and has_bools(value):
+            # numpy would take them as 0 and 1
+            raise ValueError("{}: Expected {}, got a bool".format(self.name, self.element.name))
+        try:
+            array = np.array(value)
+        except ValueError:
+            # ragged lists
+            raise ValueError("{}: Expected {} nested lists of equal length".format(self.name, len(self.shape)))
+        if array.size > 0 and array.dtype.kind not in kinds:
+            if array.dtype.kind in 'OUS':
+                # strings or mixed values are left to the items
+                return None
+            raise ValueError("{}: Expected {}, got {}".format(self.name, self.element.name, array.dtype))
+        if array.ndim != len(self.shape) and array.size > 0:
+            raise ValueError("{}: Expected {} dimensions, got {}".format(self.name, len(self.shape), array.ndim))
+        for dim, (length, expected) in enumerate(zip(array.shape, self.shape)):
+            if expected is not None and length != expected:
+                raise ValueError("{}: Expected length {} in dimension {}, got {}".format(
+                    self.name, expected, dim, length))
+        if array.size > 0:
+            if self.low is not None and array.min() < self.low:
+                raise ValueError("{}: {} is below {}".format(self.name, array.min(), self.low))
+            if self.high is not None and array.max() > self.high:
+                raise ValueError("{}: {} is above {}".format(self.name, array.max(), self.high))
+        array = array.astype(dtype, copy=False)
+        if self.ndarray:
+            array.flags.writeable = False
+        return array
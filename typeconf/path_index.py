@@ -0,0 +1,91 @@
+"""Index of all dot separated paths of a template"""
+import threading
+
+
+class PathIndex(object):
+    """
+    Maps every path of a template, e.g. "model.backbone.depth", to the keys
+    of its levels. Keys of a OneOfType may contain dots themselves, which is
+    why a path cannot simply be split.
+
+    The subtypes of a OneOfType are indexed once a path into them is
+    resolved, so only the subtypes that are used are built.
+    """
+    def __init__(self, parser):
+        # path -> levels
+        self.paths = {}
+        # path -> parser of the schema
+        self.parsers = {}
+        # path -> positions of the levels choosing a subtype, if there are any
+        self.choices = {}
+        # path -> OneOfType, levels, choices and the indexed keys of the
+        # OneOfTypes with subtypes that are not indexed yet
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.add(parser, (), ())
+
+    def add(self, parser, levels, choices):
+        from .type_factory import CompositeType, OneOfType
+        if isinstance(parser, CompositeType):
+            for key, attribute in parser.attributes.items():
+                self.add_key(key, attribute.parser, levels, choices)
+        elif isinstance(parser, OneOfType):
+            self.pending[".".join(levels)] = (parser, levels, choices + (len(levels),), set())
+
+    def add_key(self, key, sub, levels, choices):
+        sub_levels = levels + (key,)
+        path = ".".join(sub_levels)
+        self.paths[path] = sub_levels
+        self.parsers[path] = sub
+        if choices:
+            self.choices[path] = choices
+        self.add(sub, sub_levels, choices)
+
+    def expand(self, path):
+        """
+        Indexes the subtypes along path.
+
+        Returns:
+            If path is a path of the template
+        """
+        with self.lock:
+            while path not in self.paths:
+                for prefix, (parser, levels, choices, done) in list(self.pending.items()):
+                    if prefix and not path.startswith(prefix + "."):
+                        continue
+                    rest = path[len(prefix) + 1:] if prefix else path
+                    keys = [key for key in parser.subtypes if key not in done and
+                            (rest == key or rest.startswith(key + "."))]
+                    if len(keys) == 0:
+                        continue
+                    key = max(keys, key=len)
+                    done.add(key)
+                    if len(done) == len(parser.subtypes):
+                        del self.pending[prefix]
+                    self.add_key(key, parser.subtypes[key], levels, choices)
+                    break
+                else:
+                    return False
+        return True
+
+    def __contains__(self, path):
+        return path in self.paths or self.expand(path)
+
+    def __len__(self):
+        """Number of paths indexed so far"""
+        return len(self.paths)
+
+    def resolve(self, path):
+        """
+        Returns:
+            The keys of the levels and the positions choosing a subtype
+        """
+        if path not in self:
+            raise ValueError("Unknown path {}".format(path))
+        return self.paths[path], self.choices.get(path, ())
+
+    def check(self, paths):
+        """Raises a ValueError listing all unknown paths"""
+        unknown = [path for path in paths if path not in self]
+        if len(unknown) > 0:
+            raise ValueError("Unknown paths: {}".format(", ".join(unknown)))
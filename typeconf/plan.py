@@ -0,0 +1,176 @@
+"""
+Validation plans compiled from built templates.
+
+A plan validates plain configs without filling a template. Nested composite
+types are flattened into one list of steps, only the choice of a OneOfType
+needs a plan per subtype.
+"""
+import logging
+
+from .attribute import MAGIC_DEFAULT_VALUE
+from .config import Config
+from .expression import evaluate as evaluate_expression, references, evaluation_order
+
+logger = logging.getLogger()
+
+MISSING = object()
+
+# step kinds
+LEAF = 0
+COMPOSITE = 1
+NESTED = 2
+
+
+def compile_plan(parser, plans=None):
+    """
+    Returns the plan for a schema or instance parser
+
+    Args:
+        plans: id of the parser -> plan, types used in several places are compiled once
+    """
+    from .type_factory import CompositeType, OneOfType
+    if plans is None:
+        plans = {}
+    plan = plans.get(id(parser))
+    if plan is not None:
+        return plan
+    if isinstance(parser, CompositeType):
+        plan = CompositePlan(parser, plans)
+    elif isinstance(parser, OneOfType):
+        plan = OneOfPlan(parser, plans)
+    else:
+        plan = LeafPlan(parser)
+    plans[id(parser)] = plan
+    return plan
+
+
+class LeafPlan(object):
+    def __init__(self, parser):
+        self.coerce = parser.coerce
+
+    def run(self, value):
+        return self.coerce(value)
+
+
+class OneOfPlan(object):
+    """The plan of a subtype is compiled when it is chosen for the first time"""
+    def __init__(self, parser, plans=None):
+        self.name = parser.name
+        self.subtypes = parser.subtypes
+        self.branches = {}
+        # memo of the branches, the subtypes keep their schemas alive
+        self.plans = {}
+
+    def branch(self, key):
+        plan = self.branches.get(key)
+        if plan is None:
+            plan = compile_plan(self.subtypes[key], self.plans)
+            self.branches[key] = plan
+        return plan
+
+    def run(self, value):
+        if not isinstance(value, dict) or len(value) == 0:
+            raise ValueError("{}: There are no keys in {}".format(self.name, value))
+        if len(value) > 1:
+            raise ValueError("Choose only one from")
+        (key, sub), = value.items()
+        if key not in self.subtypes:
+            raise ValueError("Unknown type {} in {}. Choose from {}.".format(
+                key, self.name, str(self.subtypes.keys())))
+        return {key: self.branch(key).run(sub)}
+
+
+class CompositePlan(object):
+    """
+    Every step is a tuple
+        (slot, key, path, kind, run, default, required, const, evaluate, target)
+    The value of key is read from the mapping in slot and written into its
+    Config. Composite values are stored in slot target for the following steps.
+    """
+    def __init__(self, parser, plans=None):
+        self.steps = []
+        # slot -> accepted keys
+        self.keys = []
+        self.plans = {} if plans is None else plans
+        self.add_composite(parser, ())
+        del self.plans
+        self.steps = [tuple(step) for step in self.steps]
+
+    def add_composite(self, parser, path):
+        from .type_factory import CompositeType
+        slot = len(self.keys)
+        self.keys.append(frozenset(parser.attributes))
+        for key, attribute in parser.attributes.items():
+            sub = attribute.parser
+            step = [slot, key, ".".join(path + (key,)), LEAF, None,
+                    attribute.default, attribute.required, attribute.const, attribute.eval, None]
+            if isinstance(sub, CompositeType):
+                step[3] = COMPOSITE
+                self.steps.append(step)
+                step[9] = self.add_composite(sub, path + (key,))
+            else:
+                plan = compile_plan(sub, self.plans)
+                if isinstance(plan, LeafPlan):
+                    step[4] = plan.coerce
+                else:
+                    step[3] = NESTED
+                    step[4] = plan.run
+                self.steps.append(step)
+        return slot
+
+    def check_mapping(self, slot, values, path):
+        if not isinstance(values, dict):
+            raise ValueError("{}: Expected a mapping, got {}".format(path, values))
+        if not self.keys[slot].issuperset(values):
+            unused = [key for key in values if key not in self.keys[slot]]
+            logger.warning("There are unused keys in this config: %s", ", ".join(unused))
+
+    def run(self, cfg):
+        """
+        Returns:
+            The validated Config, cfg is not modified
+        """
+        inputs = [None] * len(self.keys)
+        outputs = [None] * len(self.keys)
+        self.check_mapping(0, cfg, "config")
+        inputs[0] = cfg
+        outputs[0] = Config()
+        # slot -> {key: (value, run)} of the eval attributes
+        expressions = {}
+        for slot, key, path, kind, run, default, required, const, evaluate, target in self.steps:
+            value = inputs[slot].get(key, MISSING)
+            if value is MISSING:
+                if required:
+                    raise ValueError("Value not set {}".format(path))
+                if default == MAGIC_DEFAULT_VALUE:
+                    raise ValueError("Value was not set but also no default value for {}".format(path))
+                value = default
+            elif const:
+                raise ValueError("{} is const, cannot set value {}".format(path, value))
+            if evaluate and kind != COMPOSITE:
+                # evaluated once all values of the slot are known
+                expressions.setdefault(slot, {})[key] = (value, run)
+                outputs[slot][key] = None
+                continue
+            if evaluate:
+                value = evaluate_expression(value)
+
+            if kind == COMPOSITE:
+                self.check_mapping(target, value, path)
+                inputs[target] = value
+                outputs[target] = Config()
+                outputs[slot][key] = outputs[target]
+            else:
+                outputs[slot][key] = run(value)
+        for slot, values in expressions.items():
+            self.evaluate(values, outputs[slot])
+        return outputs[0]
+
+    @staticmethod
+    def evaluate(values, output):
+        """Evaluates the expressions of one slot in dependency order"""
+        dependencies = {key: references(value, values) for key, (value, _) in values.items()}
+        for key in evaluation_order(dependencies):
+            value, run = values[key]
+            scope = {name: output[name] for name in references(value, output)}
+            output[key] = run(evaluate_expression(value, scope))
@@ -0,0 +1,64 @@
+"""Reusable ConfigTemplates for threaded servers"""
+import threading
+from contextlib import contextmanager
+
+
+class TemplatePool(object):
+    """
+    Templates of one type that are filled by one thread at a time and
+    reset when they are returned.
+
+        pool = TemplatePool(factory, 'parent', maxsize=16)
+        with pool.template() as template:
+            template.fill_from_cfg(cfg)
+            config = template.to_config()
+    """
+    def __init__(self, factory, name, maxsize=None):
+        """
+        Args:
+            maxsize: number of templates, None creates one whenever all are in use
+        """
+        self.factory = factory
+        self.name = name
+        self.maxsize = maxsize
+        self.free = []
+        self.created = 0
+        self.available = threading.Condition()
+
+    def acquire(self, timeout=None):
+        """
+        Returns a template with no values set
+
+        Raises:
+            TimeoutError: maxsize templates are in use after timeout seconds
+        """
+        with self.available:
+            if not self.available.wait_for(self.can_acquire, timeout):
+                raise TimeoutError("All {} templates of {} are in use".format(self.maxsize, self.name))
+            if len(self.free) > 0:
+                return self.free.pop()
+            self.created += 1
+        try:
+            return self.factory.build_template(self.name)
+        except Exception:
+            with self.available:
+                self.created -= 1
+                self.available.notify()
+            raise
+
+    def can_acquire(self):
+        return len(self.free) > 0 or self.maxsize is None or self.created < self.maxsize
+
+    def release(self, template):
+        template.reset()
+        with self.available:
+            self.free.append(template)
+            self.available.notify()
+
+    @contextmanager
+    def template(self, timeout=None):
+        template = self.acquire(timeout)
+        try:
+            yield template
+        finally:
+            self.release(template)
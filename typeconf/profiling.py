@@ -0,0 +1,164 @@
+"""
+Timings and counters of the phases of building templates and filling configs.
+
+    from typeconf import profiling
+    with profiling.record() as recorder:
+        factory = TypeFactory('templates')
+        config = factory.build_template('parent').to_config()
+    print(recorder.report())
+    recorder.dump('trace.json')  # chrome://tracing or https://ui.perfetto.dev
+
+Setting TYPECONF_PROFILE=report.txt or TYPECONF_PROFILE=trace.json records
+the whole process and writes the result at exit.
+Without a recorder the hooks only check a global.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# the active Recorder, None when recording is disabled
+RECORDER = None
+# records the whole process if set, skipped by ConfigTemplate.fill_from_env
+ENVIRON_VARIABLE = "TYPECONF_PROFILE"
+
+
+class _NoPhase(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+class _Phase(object):
+    __slots__ = ('recorder', 'name', 'template', 'start')
+
+    def __init__(self, recorder, name, template):
+        self.recorder = recorder
+        self.name = name
+        self.template = template
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.recorder.add(self.name, self.template, self.start, time.perf_counter())
+        return False
+
+
+def phase(name, template=None):
+    """Context manager timing the phase name, optionally for one template"""
+    if RECORDER is None:
+        return _NO_PHASE
+    return _Phase(RECORDER, name, template)
+
+
+def count(name, n=1):
+    if RECORDER is not None:
+        RECORDER.count(name, n)
+
+
+class Recorder(object):
+    def __init__(self):
+        # phase -> [calls, seconds]
+        self.phases = {}
+        # (phase, template) -> [calls, seconds]
+        self.templates = {}
+        self.counters = {}
+        # (phase, template, start, end, thread)
+        self.events = []
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def add(self, name, template, start, end):
+        seconds = end - start
+        with self.lock:
+            entry = self.phases.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            if template is not None:
+                entry = self.templates.setdefault((name, template), [0, 0.0])
+                entry[0] += 1
+                entry[1] += seconds
+            self.events.append((name, template, start, end, threading.get_ident()))
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self, top=20):
+        """Returns the timings as text, phases include the phases nested in them"""
+        lines = ["{:24s} {:>8s} {:>12s}".format("phase", "calls", "seconds")]
+        for name, (calls, seconds) in sorted(self.phases.items(), key=lambda item: -item[1][1]):
+            lines.append("{:24s} {:8d} {:12.6f}".format(name, calls, seconds))
+        if len(self.templates) > 0:
+            lines.append("")
+            lines.append("{:24s} {:>8s} {:>12s}  {}".format("phase", "calls", "seconds", "template"))
+            slowest = sorted(self.templates.items(), key=lambda item: -item[1][1])[:top]
+            for (name, template), (calls, seconds) in slowest:
+                lines.append("{:24s} {:8d} {:12.6f}  {}".format(name, calls, seconds, template))
+        if len(self.counters) > 0:
+            lines.append("")
+            for name, value in sorted(self.counters.items()):
+                lines.append("{:24s} {:8d}".format(name, value))
+        return "\n".join(lines)
+
+    def trace(self):
+        """Returns the phases in the Chrome trace event format"""
+        pid = os.getpid()
+        events = []
+        for name, template, start, end, thread in self.events:
+            event = {"name": name if template is None else "{} {}".format(name, template),
+                     "cat": name, "ph": "X", "pid": pid, "tid": thread,
+                     "ts": (start - self.origin) * 1e6, "dur": (end - start) * 1e6}
+            if template is not None:
+                event["args"] = {"template": str(template)}
+            events.append(event)
+        events.append({"name": "counters", "ph": "C", "pid": pid, "tid": 0,
+                       "ts": (time.perf_counter() - self.origin) * 1e6, "args": self.counters})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path):
+        """Writes a Chrome trace for .json files, otherwise the report. - prints the report"""
+        if path == "-":
+            print(self.report(), file=sys.stderr)
+        elif path.endswith(".json"):
+            with open(path, 'w') as f:
+                json.dump(self.trace(), f)
+        else:
+            with open(path, 'w') as f:
+                f.write(self.report() + "\n")
+
+
+@contextmanager
+def record(recorder=None):
+    """Records all phases in this context into recorder or a new Recorder"""
+    global RECORDER
+    previous = RECORDER
+    RECORDER = Recorder() if recorder is None else recorder
+    try:
+        yield RECORDER
+    finally:
+        RECORDER = previous
+
+
+def record_process(path):
+    """Records until the process exits and writes the result to path, see Recorder.dump"""
+    global RECORDER
+    RECORDER = recorder = Recorder()
+    atexit.register(recorder.dump, path)
+    return recorder
+
+
+if os.environ.get(ENVIRON_VARIABLE):
+    record_process(os.environ[ENVIRON_VARIABLE])
@@ -0,0 +1,360 @@
+"""
+Read-only binary snapshots of validated configs for worker processes.
+
+A snapshot is written once into shared memory or a file. Workers attach
+to it and read values on access, nothing is deserialized up front and all
+processes share one copy.
+
+    snapshot = Snapshot.create(template.to_config())
+    pool = multiprocessing.Pool(8, initializer=init, initargs=(snapshot,))
+    # in the worker, only the name of the shared memory was pickled
+    snapshot.config.model.width
+
+Format: a header followed by values, each starting with a tag byte.
+Mappings store their keys sorted, so a key is found by binary search.
+"""
+import mmap
+import pickle
+import struct
+
+from .config import Config, FrozenConfig, LazyConfig
+
+MAGIC = b'TCSN'
+VERSION = 1
+HEADER = struct.Struct('<4sBxxxI')
+U32 = struct.Struct('<I')
+INT = struct.Struct('<q')
+FLOAT = struct.Struct('<d')
+
+NONE, FALSE, TRUE, INTEGER, NUMBER, STRING, MAPPING, SEQUENCE, PICKLED = range(9)
+
+# name -> Snapshot of the shared memory attached in this process
+_ATTACHED = {}
+
+
+class Writer(object):
+    def __init__(self):
+        self.data = bytearray(HEADER.size)
+        # (type, value) -> offset of the scalars written so far
+        self.scalars = {}
+
+    def offset(self):
+        offset = len(self.data)
+        if offset > 0xFFFFFFFF:
+            raise ValueError("Configs larger than 4 GB cannot be stored in a snapshot")
+        return offset
+
+    def write(self, value):
+        """Writes value and returns its offset"""
+        if isinstance(value, FrozenConfig):
+            value = value._asdict()
+        elif isinstance(value, LazyConfig):
+            value = value.materialize()
+        if isinstance(value, dict):
+            return self.write_mapping(value)
+        if isinstance(value, (list, tuple)):
+            offsets = [self.write(item) for item in value]
+            offset = self.offset()
+            self.data.append(SEQUENCE)
+            self.data += U32.pack(len(offsets))
+            self.data += struct.pack('<{}I'.format(len(offsets)), *offsets)
+            return offset
+        key = (type(value), value)
+        try:
+            offset = self.scalars.get(key)
+        except TypeError:
+            # unhashable values are not deduplicated
+            return self.write_scalar(value)
+        if offset is None:
+            offset = self.write_scalar(value)
+            self.scalars[key] = offset
+        return offset
+
+    def write_mapping(self, mapping):
+        keys = sorted(mapping, key=lambda key: key.encode())
+        key_offsets = [self.write(key) for key in keys]
+        value_offsets = [self.write(mapping[key]) for key in keys]
+        offset = self.offset()
+        self.data.append(MAPPING)
+        self.data += U32.pack(len(keys))
+        self.data += struct.pack('<{}I'.format(2 * len(keys)), *(key_offsets + value_offsets))
+        return offset
+
+    def write_scalar(self, value):
+        offset = self.offset()
+        if value is None:
+            self.data.append(NONE)
+        elif value is False:
+            self.data.append(FALSE)
+        elif value is True:
+            self.data.append(TRUE)
+        elif type(value) is int and -2 ** 63 <= value < 2 ** 63:
+            self.data.append(INTEGER)
+            self.data += INT.pack(value)
+        elif type(value) is float:
+            self.data.append(NUMBER)
+            self.data += FLOAT.pack(value)
+        elif type(value) is str:
+            encoded = value.encode()
+            self.data.append(STRING)
+            self.data += U32.pack(len(encoded))
+            self.data += encoded
+        else:
+            encoded = pickle.dumps(value)
+            self.data.append(PICKLED)
+            self.data += U32.pack(len(encoded))
+            self.data += encoded
+        return offset
+
+
+def dumps(config):
+    """Returns the snapshot of config as bytes"""
+    writer = Writer()
+    root = writer.write(config)
+    writer.data[:HEADER.size] = HEADER.pack(MAGIC, VERSION, root)
+    return bytes(writer.data)
+
+
+def loads(buffer):
+    """Returns the root of a snapshot in buffer, e.g. bytes from dumps"""
+    return Snapshot(buffer).config
+
+
+def decode(snapshot, offset):
+    buffer = snapshot.buffer
+    tag = buffer[offset]
+    if tag == MAPPING:
+        return SnapshotConfig(snapshot, offset)
+    if tag == STRING:
+        size, = U32.unpack_from(buffer, offset + 1)
+        return str(buffer[offset + 5:offset + 5 + size], 'utf-8')
+    if tag == INTEGER:
+        return INT.unpack_from(buffer, offset + 1)[0]
+    if tag == NUMBER:
+        return FLOAT.unpack_from(buffer, offset + 1)[0]
+    if tag == NONE:
+        return None
+    if tag == FALSE:
+        return False
+    if tag == TRUE:
+        return True
+    if tag == SEQUENCE:
+        size, = U32.unpack_from(buffer, offset + 1)
+        offsets = struct.unpack_from('<{}I'.format(size), buffer, offset + 5)
+        return tuple(decode(snapshot, item) for item in offsets)
+    if tag == PICKLED:
+        size, = U32.unpack_from(buffer, offset + 1)
+        return pickle.loads(buffer[offset + 5:offset + 5 + size])
+    raise ValueError("Corrupt snapshot, unknown tag {} at {}".format(tag, offset))
+
+
+class SnapshotConfig(object):
+    """
+    Read-only view of a mapping in a snapshot with the access of Config.
+    Values are decoded on first access, lists are returned as tuples.
+    """
+    __slots__ = ('_snapshot', '_offset', '_size', '_values')
+
+    def __init__(self, snapshot, offset):
+        self._snapshot = snapshot
+        self._offset = offset
+        self._size, = U32.unpack_from(snapshot.buffer, offset + 1)
+        # key -> value for the keys accessed so far
+        self._values = {}
+
+    def _key(self, pos):
+        buffer = self._snapshot.buffer
+        offset, = U32.unpack_from(buffer, self._offset + 5 + 4 * pos)
+        size, = U32.unpack_from(buffer, offset + 1)
+        return bytes(buffer[offset + 5:offset + 5 + size])
+
+    def _value(self, pos):
+        offset, = U32.unpack_from(self._snapshot.buffer, self._offset + 5 + 4 * (self._size + pos))
+        return decode(self._snapshot, offset)
+
+    def _find(self, key):
+        """Returns the position of key, -1 if it is missing"""
+        encoded = key.encode()
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._size and self._key(low) == encoded:
+            return low
+        return -1
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        pos = self._find(key) if isinstance(key, str) else -1
+        if pos < 0:
+            raise KeyError(key)
+        value = self._value(pos)
+        self._values[key] = value
+        return value
+
+    def __getattr__(self, key):
+        if key.startswith('_'):
+            raise AttributeError(key)
+        # behaves like Config for unknown keys
+        return self.get(key)
+
+    def __setattr__(self, key, value):
+        if key in SnapshotConfig.__slots__:
+            object.__setattr__(self, key, value)
+            return
+        raise AttributeError("Snapshots are read-only, cannot set {}".format(key))
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def lookup(self, path):
+        """Returns the value at a dot separated path, keys may contain dots"""
+        parts = path.split('.')
+        node = self
+        start = 0
+        while start < len(parts):
+            # the shortest key matching the next parts
+            for end in range(start + 1, len(parts) + 1):
+                key = '.'.join(parts[start:end])
+                if isinstance(node, SnapshotConfig) and key in node:
+                    node = node[key]
+                    start = end
+                    break
+            else:
+                raise KeyError(path)
+        return node
+
+    def __contains__(self, key):
+        return key in self._values or (isinstance(key, str) and self._find(key) >= 0)
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        return [key.decode() for key in map(self._key, range(self._size))]
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_config(self):
+        """Decodes the whole mapping into a Config"""
+        return Config((key, value.to_config() if isinstance(value, SnapshotConfig) else value)
+                      for key, value in self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, SnapshotConfig):
+            other = other.to_config()
+        return self.to_config() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "SnapshotConfig({})".format(", ".join(self.keys()))
+
+    def __str__(self):
+        return str(self.to_config())
+
+    def __reduce__(self):
+        return decode, (self._snapshot, self._offset)
+
+
+class Snapshot(object):
+    """
+    A snapshot in a buffer, shared memory or a memory mapped file.
+    Pickling a shared or file snapshot only pickles the name or path.
+    """
+    def __init__(self, buffer, shared_memory=None, path=None, mapped=None):
+        magic, version, root = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a snapshot of version {}".format(VERSION))
+        self.buffer = buffer
+        self.root = root
+        self.shared_memory = shared_memory
+        self.path = path
+        self.mapped = mapped
+
+    @property
+    def config(self):
+        return decode(self, self.root)
+
+    @classmethod
+    def create(cls, config):
+        """Writes config into new shared memory, see unlink"""
+        from multiprocessing import shared_memory
+        data = dumps(config)
+        memory = shared_memory.SharedMemory(create=True, size=len(data))
+        memory.buf[:len(data)] = data
+        return cls(memory.buf, shared_memory=memory)
+
+    @classmethod
+    def attach(cls, name):
+        """Opens the shared memory created by another process, once per process"""
+        from multiprocessing import shared_memory
+        snapshot = _ATTACHED.get(name)
+        if snapshot is not None and snapshot.buffer is not None:
+            return snapshot
+        try:
+            # only the creating process should remove it, python >= 3.13
+            memory = shared_memory.SharedMemory(name, track=False)
+        except TypeError:
+            memory = shared_memory.SharedMemory(name)
+        snapshot = cls(memory.buf, shared_memory=memory)
+        _ATTACHED[name] = snapshot
+        return snapshot
+
+    @classmethod
+    def write(cls, config, path):
+        """Writes config into the file at path and maps it"""
+        with open(path, 'wb') as f:
+            f.write(dumps(config))
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path):
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped, path=path, mapped=mapped)
+
+    @property
+    def name(self):
+        return None if self.shared_memory is None else self.shared_memory.name
+
+    def close(self):
+        """Detaches from the memory, configs read from the snapshot can no longer be used"""
+        self.buffer = None
+        if self.shared_memory is not None:
+            self.shared_memory.close()
+        if self.mapped is not None:
+            self.mapped.close()
+
+    def unlink(self):
+        """Frees the shared memory once all processes closed it"""
+        self.shared_memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __reduce__(self):
+        if self.shared_memory is not None:
+            return Snapshot.attach, (self.shared_memory.name,)
+        if self.path is not None:
+            return Snapshot.open, (self.path,)
+        return Snapshot, (bytes(self.buffer),)
@@ -1,17 +1,28 @@
 """This works sequentially by performing first a dependency analysis"""
 
+import copy
+import hashlib
 import logging
 import json
 import os
+import re
+import threading
+import weakref
+from .cache import TemplateCache, CACHE_VERSION, TYPE_REDUCERS
 from .dep_graph import DependencyGraph
 from .file_tree import FileTree
 from . import utils as u
-from .parser import BASE_TYPES, Parser
+from . import profiling as prof
+from . import fingerprint
+from .parser import BASE_TYPES, NUMERIC_KINDS, Parser, ListType
 from .attribute import AttributeFactory
 from .config_template import ConfigTemplate
-from .config import Config
+from .path_index import PathIndex
+from .config import Config, LazyConfig, frozen_class
+from .expression import references, evaluation_order
 
 MAGIC_SPLIT_NAME = '.'
+LIST_PATTERN = re.compile(r'^list<(.+)>$')
 
 logger = logging.getLogger()
 
@@ -21,14 +32,16 @@ class OneOf(Parser):
     """
     One Of value
     """
+    __slots__ = ('options',)
+
     def __init__(self, name):
         super().__init__(name)
         self.options = set()
 
-    def parse(self):
-        if self.value not in self.options:
-            raise ValueError("Expected a value from {}. Got {}.".format(self, self.value))
-        return True
+    def coerce(self, value):
+        if value not in self.options:
+            raise ValueError("Expected a value from {}. Got {}.".format(self, value))
+        return value
 
     def add_option(self, option):
         self.options.add(option)
@@ -41,6 +54,74 @@ class OneOf(Parser):
         return ', '.join(str(o) for o in self.options)
 
 
+class Subtypes(object):
+    """
+    Subtypes of a OneOfType by name. A subtype is only built once it is
+    accessed, listing the names builds nothing.
+    """
+    __slots__ = ('types', 'build')
+
+    def __init__(self, names, build):
+        """
+        Args:
+            build: returns the schema of a name, None for pickled subtypes,
+                   types loaded from the cache are bound by TypeFactory.bind
+        """
+        # name -> schema, None until it is built
+        self.types = dict.fromkeys(names)
+        self.build = build
+
+    def __getitem__(self, name):
+        typ = self.types[name]
+        if typ is None:
+            if self.build is None:
+                raise ValueError("Subtype {} was not built before it was pickled and cannot be "
+                                 "built without its TypeFactory".format(name))
+            typ = self.build(name)
+            self.types[name] = typ
+        return typ
+
+    def get(self, name, default=None):
+        if name not in self.types:
+            return default
+        return self[name]
+
+    def __contains__(self, name):
+        return name in self.types
+
+    def __iter__(self):
+        return iter(self.types)
+
+    def __len__(self):
+        return len(self.types)
+
+    def keys(self):
+        return self.types.keys()
+
+    def items(self):
+        """Builds all subtypes"""
+        return [(name, self[name]) for name in self.types]
+
+    def values(self):
+        return [self[name] for name in self.types]
+
+    def __getstate__(self):
+        # the built subtypes are kept, the factory is not pickled
+        return self.types
+
+    def __setstate__(self, state):
+        self.types = state
+        self.build = None
+
+
+def reduce_unbuilt(subtypes):
+    """Subtypes are cached by themselves, the factory is set by TypeFactory.bind"""
+    return Subtypes, (list(subtypes.types), None)
+
+
+TYPE_REDUCERS[Subtypes] = reduce_unbuilt
+
+
 class OneOfType(Parser):
     """
     One of Type
@@ -48,6 +129,9 @@ class OneOfType(Parser):
         SubType:
             a1: 0
     """
+    __slots__ = ('subtypes', 'children')
+    nested = True
+
     @property
     def value(self):
         return self._value
@@ -60,28 +144,91 @@ class OneOfType(Parser):
         # only set when we have atleast one value
         self._value = value
         self.isset = True
+        self.touch()
         for k, v in value.items():
             if k not in self.subtypes:
                 raise ValueError("Unknown type {} in {}. Choose from {}.".format(k, self.name, str(self.subtypes.keys())))
-            self.subtypes[k].value = v
+            self.get_parser(k).value = v
 
     def __init__(self, name, subtypes):
         super().__init__(name)
         assert len(subtypes) > 0, "At least on subtype is necessary"
         self.subtypes = subtypes
+        # instances of the subtypes, created when a value is set
+        self.children = {}
+
+    def instantiate(self):
+        instance = super().instantiate()
+        instance.children = {}
+        return instance
+
+    def get_parser(self, key):
+        parser = self.children.get(key)
+        if parser is None:
+            parser = self.subtypes[key].instantiate()
+            parser.parent = self
+            self.children[key] = parser
+        return parser
+
+    def select(self, key):
+        """Chooses the subtype key and returns its instance"""
+        if key not in self.subtypes:
+            raise ValueError("Unknown type {} in {}. Choose from {}.".format(key, self.name, str(self.subtypes.keys())))
+        if not self.isset or list(self._value.keys()) != [key]:
+            # the values are held by the subtype
+            self._value = {key: None}
+            self.isset = True
+            self.touch()
+        return self.get_parser(key)
+
+    def raw_value(self):
+        if self.value is None:
+            return None
+        return {key: self.children[key].raw_value() for key in self.value}
 
     def parse(self):
         if len(self.value.keys()) > 1:
             raise ValueError("Choose only one from")
 
         sub = list(self.value.keys())[0]
-        sub = self.subtypes[sub]
-        return sub.parse()
+        sub = self.get_parser(sub)
+        if sub.dirty:
+            sub.parse()
+        self.dirty = False
+        return True
 
-    def to_config(self):
+    def resolve(self, key):
+        """Returns the lazy config of the chosen subtype"""
+        sub = self.get_parser(key)
+        if sub.dirty and not sub.nested:
+            sub.parse()
+        return sub.to_config(lazy=True)
+
+    def to_config(self, frozen=False, lazy=False):
+        if lazy:
+            if len(self.value.keys()) > 1:
+                raise ValueError("Choose only one from")
+            return LazyConfig(self.value.keys(), self.resolve)
+        if frozen and self.config is not None:
+            return self.config
+        subkey = list(self.value.keys())[0]
+        sub = self.get_parser(subkey).to_config(frozen)
+        if not frozen:
+            # callers may change Configs, they are never shared
+            return {subkey: sub}
+        config = frozen_class(self.name, (subkey,))(sub)
+        if not self.dirty:
+            self.config = config
+        return config
+
+    def fingerprint(self):
+        if self.digest is not None:
+            return self.digest
         subkey = list(self.value.keys())[0]
-        sub = self.subtypes[subkey]
-        return {subkey: sub.to_config()}
+        encoded = b'h' + fingerprint.mapping_digest([(subkey, self.get_parser(subkey).fingerprint())])
+        if not self.dirty:
+            self.digest = encoded
+        return encoded
 
 
 class MultipleOfType(Parser):
@@ -93,6 +240,8 @@ class MultipleOfType(Parser):
         SubType2:
             a1: 0
     """
+    __slots__ = ()
+
     def __init__(self, name):
         super().__init__(name)
         raise NotImplementedError()
@@ -101,6 +250,9 @@ class MultipleOfType(Parser):
 # TODO try to do everything in parse
 
 class CompositeType(Parser):
+    __slots__ = ('attributes', 'children', 'sources')
+    nested = True
+
     @property
     def value(self):
         return self._value
@@ -109,57 +261,177 @@ class CompositeType(Parser):
     def value(self, value):
         self._value = value
         self.isset = True
+        self.touch()
         """
         Sets all the attribute values
         TODO what happens if not in cache
         TODO what about cycles
         """
         # assert that this is a mapping
-        for key, attribute in self.attributes.items():
-            # if no value for attribute
-            if key not in value:
+        unused = []
+        for key, sub in value.items():
+            # if no attribute for value
+            if key not in self.attributes:
+                unused.append(key)
                 continue
-            attribute.parser.value = value.pop(key)
+            self.get_parser(key).value = sub
 
-        if len(value) != 0:
-            logger.warning("There are unused keys in this config: %s", ", ".join(value.keys()))
+        if len(unused) != 0:
+            logger.warning("There are unused keys in this config: %s", ", ".join(unused))
 
     def __init__(self, name):
         super().__init__(name)
         self.attributes = {}
+        # instances of the attribute parsers, created on first use
+        self.children = {}
+        # key -> expression of the evaluated eval attributes
+        self.sources = {}
 
     def __str__(self):
         string = "{} with {} attributes\n".format(self.name, len(self.attributes))
         for key, attribute in self.attributes.items():
-            string += "{}: {}\n".format(key, attribute)
+            parser = self.children.get(key)
+            string += "{}: {} {}\n".format(key, attribute, None if parser is None else parser.value)
         # remove last new line
         string = string[:-1]
         return string
 
+    def instantiate(self):
+        instance = super().instantiate()
+        instance.children = {}
+        instance.sources = {}
+        return instance
+
+    def get_parser(self, key):
+        parser = self.children.get(key)
+        if parser is None:
+            parser = self.attributes[key].parser.instantiate()
+            parser.parent = self
+            self.children[key] = parser
+        return parser
+
+    def raw_value(self):
+        return {key: self.sources[key] if key in self.sources and not parser.dirty else parser.raw_value()
+                for key, parser in self.children.items() if parser.isset}
+
     def add_attribute(self, name, attribute):
         if name in self.attributes:
             raise KeyError("Attribute with key {} already exists".format(name))
         self.attributes[name] = attribute
 
     def parse(self):
+        """Parses the attributes that changed since the last parse"""
         # TODO
         is_valid = True
+        changed = set()
+        dependencies = {}
         for key, attribute in self.attributes.items():
+            parser = self.get_parser(key)
+            if attribute.eval:
+                dependencies[key] = None
+                continue
+            if not parser.dirty:
+                continue
             try:
-                attribute.parse()
+                attribute.parse(parser)
             except ValueError as e:
-                print(key, attribute.parser.value)
+                print(key, parser.value)
                 raise
+            changed.add(key)
+        if prof.RECORDER is not None:
+            prof.RECORDER.count("attributes_validated", len(changed))
+        if len(dependencies) > 0:
+            # expressions are evaluated once the values they refer to are parsed
+            for key in dependencies:
+                dependencies[key] = references(self.source(key), dependencies)
+            for key in evaluation_order(dependencies):
+                self.evaluate(key, changed)
+        self.dirty = False
         return is_valid
 
+    def source(self, key):
+        """Returns the expression of the eval attribute key"""
+        parser = self.get_parser(key)
+        if not parser.dirty:
+            return self.sources[key]
+        return parser.value if parser.isset else self.attributes[key].default
+
+    def evaluate(self, key, changed):
+        """Evaluates the eval attribute key if it or a value it refers to changed"""
+        parser = self.get_parser(key)
+        names = references(self.source(key), self.attributes)
+        if not parser.dirty:
+            if changed.isdisjoint(names):
+                return
+            # evaluate the expression again, isset is kept
+            parser._value = self.sources[key]
+            parser.touch()
+        self.sources[key] = self.source(key)
+        scope = {name: self.get_parser(name).to_config() for name in names}
+        self.attributes[key].parse(parser, scope=scope)
+        changed.add(key)
+
     def __len__(self):
         return len(self.attributes)
 
-    def to_config(self):
-        return Config({key: attribute.parser.to_config() for key, attribute in self.attributes.items()})
+    def resolve(self, key):
+        """Parses the attribute key and returns its lazy config"""
+        parser = self.get_parser(key)
+        attribute = self.attributes[key]
+        if attribute.eval:
+            dependencies = {k: references(self.source(k), self.attributes)
+                            for k, a in self.attributes.items() if a.eval}
+            # raises on cycles before resolving the references
+            evaluation_order(dependencies)
+            names = dependencies[key]
+            if len(names) > 0 and not parser.dirty:
+                parser._value = self.sources[key]
+                parser.touch()
+            if parser.dirty:
+                self.sources[key] = self.source(key)
+                scope = {name: self.resolve(name) for name in names}
+                attribute.parse(parser, scope=scope)
+        elif parser.dirty:
+            attribute.parse(parser, shallow=parser.nested)
+        return parser.to_config(lazy=True)
+
+    def to_config(self, frozen=False, lazy=False):
+        """
+        Unchanged branches are not parsed again. Frozen configs share them
+        with the previous result, Configs are built anew for every call.
+
+        Args:
+            frozen: return an immutable FrozenConfig instead of a Config
+            lazy: return a LazyConfig parsing the attributes on access,
+                  the values need not be parsed before
+        """
+        if lazy:
+            return LazyConfig(self.attributes, self.resolve)
+        if frozen and self.config is not None:
+            return self.config
+        if not frozen:
+            # callers may change Configs, they are never shared
+            return Config({key: self.get_parser(key).to_config() for key in self.attributes})
+        cls = frozen_class(self.name, self.attributes)
+        config = cls(*[self.get_parser(key).to_config(True) for key in self.attributes])
+        if not self.dirty:
+            self.config = config
+        return config
+
+    def fingerprint(self):
+        """fingerprint.encode of to_config(), only the changed attributes are hashed again"""
+        if self.digest is not None:
+            return self.digest
+        encoded = b'h' + fingerprint.mapping_digest(
+            [(key, self.get_parser(key).fingerprint()) for key in self.attributes])
+        if not self.dirty:
+            self.digest = encoded
+        return encoded
 
 
 class FileType(Parser):
+    __slots__ = ('overwrite', 'make_path')
+
     def __init__(self, name, overwrite=False, make_path=True):
         self.__init__(name)
         self.overwrite = overwrite
@@ -187,6 +459,8 @@ class FileType(Parser):
 
 
 class FolderType(Parser):
+    __slots__ = ('make_path',)
+
     def __init__(self, make_path=True):
         self.make_path = path
     def parse(self):
@@ -204,24 +478,114 @@ class FolderType(Parser):
 
 
 class TypeFactory(object):
-    def __init__(self, *args):
+    def __init__(self, *args, lazy=False, cache=None, workers=None, processes=False):
+        """
+        Args:
+            args: search directories to register
+            lazy: only read template files once a type that
+                  depends on them is built
+            cache: True, a directory or a TemplateCache to persist
+                   parsed templates and built types between processes
+            workers: number of threads reading template files,
+                     None reads them sequentially
+            processes: read the template files with a process pool
+        """
         self.types = {}
         self.dependency_graph = DependencyGraph()
         self.file_tree = FileTree()
+        self.lazy = lazy
+        self.workers = workers
+        self.processes = processes
+        # name -> path of template files that have not been read yet
+        self.pending = {}
+        if cache is True:
+            cache = TemplateCache()
+        elif isinstance(cache, str):
+            cache = TemplateCache(cache)
+        self.cache = cache
+        # name -> content digest of the template files, only with cache
+        self.digests = {}
+        # name -> PathIndex
+        self.indices = {}
+        # (path, lazy) of the registered search directories
+        self.search_directories = []
+        # name -> path and structure of all template files
+        self.paths = {}
+        self.structures = {}
+        # name -> (mtime, size) of the template files when they were read
+        self.stats = {}
+        # name -> structure of the folders
+        self.directories = {}
+        # name -> templates built from the type, see refresh
+        self.templates = {}
+        # held while types are loaded, built or refreshed. Built types are
+        # read without it, every type is built once.
+        self.lock = threading.RLock()
         for name, typ in BASE_TYPES.items():
             self.register_type(name, typ(name))
         for arg in args:
             self.register_search_directory(arg)
 
-    def register_search_directory(self, path):
-        for path, structure, type_enum in u.discover(path):
+    def register_search_directory(self, path, lazy=None):
+        with self.lock:
+            with prof.phase("discover", path):
+                lazy, files = self.add_entries(path, lazy, u.discover(path))
+            if not lazy:
+                self.load_files(files)
+            if self.cache is not None:
+                self.cache.save()
+
+    async def aregister_search_directory(self, path, lazy=None):
+        """register_search_directory without blocking the event loop, see aio"""
+        from . import aio
+        async with aio.lock(self):
+            with prof.phase("discover", path):
+                entries = await aio.run(lambda: list(u.discover(path)))
+            # the lock of the factory is only taken in the executor, as
+            # refresh holds it while it reads files
+            lazy, files = await aio.run(self.locked, self.add_entries, path, lazy, entries)
+            if not lazy:
+                await self.aload_files(files)
+            if self.cache is not None:
+                await aio.run(self.cache.save)
+
+    def add_entries(self, path, lazy, entries):
+        """
+        Adds the search directory path and registers its entries
+
+        Returns:
+            If its files are loaded lazily and the names of the files
+        """
+        lazy = self.add_search_directory(path, lazy)
+        return lazy, self.register_entries(entries)
+
+    def add_search_directory(self, path, lazy):
+        """Returns if the files of path are loaded lazily"""
+        if lazy is None:
+            lazy = self.lazy
+        self.search_directories.append((path, lazy))
+        if self.cache is not None:
+            self.cache.open(path)
+        return lazy
+
+    def register_entries(self, entries):
+        """
+        Registers the files and folders found by utils.discover
+
+        Returns:
+            The names of the files, which are not read yet
+        """
+        files = []
+        for path, structure, type_enum in entries:
             name = MAGIC_SPLIT_NAME.join(structure)
             if type_enum == u.FILE_ENUM:
-                self.register_file(name, path, structure)
+                self.defer_file(name, path, structure)
+                files.append(name)
             elif type_enum == u.DIR_ENUM:
                 self.register_directory(name, path, structure)
             else:
                 raise ValueError("Unknown type {}".format(type_enum))
+        return files
 
     def register_directory(self, name, path, structure):
         # TODO dependencies are not set correctly
@@ -229,14 +593,195 @@ class TypeFactory(object):
         # cfg is None if it is a folder
         dependencies = self.file_tree.get(structure)
         self.dependency_graph.add(name, None, set(dependencies))
+        self.directories[name] = structure
 
     def register_file(self, name, path, structure):
-        cfg = u.read_file(path)
-        if cfg is None:
-            logger.warning("Skipping %s (%s)", name, path)
+        self.defer_file(name, path, structure)
+        self.load_files([name])
 
+    def defer_file(self, name, path, structure):
+        """Makes the file known without reading it, see load"""
         self.file_tree.add(name, structure)
-        self.register_cfg(name, cfg)
+        self.pending[name] = path
+        self.paths[name] = path
+        self.structures[name] = structure
+
+    def load_files(self, names):
+        """Reads and registers pending template files"""
+        with self.lock:
+            paths = self.take_pending(names)
+            with prof.phase("read"):
+                if self.cache is not None:
+                    contents = self.cache.read_many(paths, self.workers, self.processes)
+                else:
+                    contents = [(cfg, None) for cfg in u.read_files(paths, self.workers, self.processes)]
+            self.register_contents(names, paths, contents)
+
+    async def aload_files(self, names):
+        """load_files reading in the executor of aio, the caller holds aio.lock"""
+        from . import aio
+        # stats the files
+        paths = await aio.run(self.locked, self.take_pending, names)
+        with prof.phase("read"):
+            if self.cache is not None:
+                contents = await aio.run(self.locked, self.cache.read_many, paths)
+            else:
+                contents = [(cfg, None) for cfg in await aio.read_files(paths)]
+        await aio.run(self.locked, self.register_contents, names, paths, contents)
+
+    def locked(self, fn, *args):
+        with self.lock:
+            return fn(*args)
+
+    def take_pending(self, names):
+        """Returns the paths of the pending files names, which are no longer pending"""
+        paths = [self.pending.pop(name) for name in names]
+        for name, path in zip(names, paths):
+            # before reading, a change while reading is found by refresh
+            self.stats[name] = self.stat(path)
+        if prof.RECORDER is not None:
+            prof.RECORDER.count("files_read", len(names))
+            prof.RECORDER.count("bytes_read", sum(self.stats[name][1] for name in names))
+        return paths
+
+    def register_contents(self, names, paths, contents):
+        """Registers the (cfg, digest) read from the template files"""
+        for name, path, (cfg, digest) in zip(names, paths, contents):
+            if digest is not None:
+                self.digests[name] = digest
+            if cfg is None:
+                logger.warning("Skipping %s (%s)", name, path)
+            self.register_cfg(name, cfg)
+
+    def load(self, name):
+        """
+        Reads all pending template files that are reachable from name.
+        Nothing is done for types that are already registered.
+        The files of one level of dependencies are read together.
+        """
+        for level in self.levels(name):
+            self.load_files(level)
+
+    async def aload(self, name):
+        for level in self.levels(name):
+            await self.aload_files(level)
+
+    def levels(self, name):
+        """Yields the pending files of every level of dependencies, once they are loaded the next level is known"""
+        visited = {name}
+        level = [name]
+        while level:
+            yield [name for name in level if name in self.pending]
+            next_level = []
+            for name in level:
+                if name not in self.dependency_graph.types:
+                    # reported by the dependency analysis
+                    continue
+                node = self.dependency_graph.get_node(name)
+                if node.cfg is None:
+                    # files of a folder are read once they are chosen
+                    continue
+                for dep in node.dependency_list:
+                    if dep not in visited:
+                        visited.add(dep)
+                        next_level.append(dep)
+            level = next_level
+
+    @staticmethod
+    def stat(path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def refresh(self):
+        """
+        Checks the search directories for changed, added and removed
+        template files. Only those files are read again and only the types
+        depending on them are rebuilt. Templates built from a rebuilt type
+        are reloaded, see ConfigTemplate.reload.
+
+        Returns:
+            The names of all affected types
+        """
+        with prof.phase("refresh"):
+            with self.lock:
+                affected, reloads = self._refresh()
+            # without the lock of the factory, users of a template hold its
+            # lock while they build subtypes
+            for template, parser, index in reloads:
+                try:
+                    template.reload(parser, index)
+                except Exception:
+                    logger.exception("Reloading a template of %s failed", template.name)
+        return affected
+
+    def _refresh(self):
+        """
+        Returns:
+            The names of all affected types and (template, parser, index)
+            of the templates to reload
+        """
+        files = {}
+        directories = {}
+        for root, lazy in self.search_directories:
+            for path, structure, type_enum in u.discover(root):
+                name = MAGIC_SPLIT_NAME.join(structure)
+                if type_enum == u.FILE_ENUM:
+                    files[name] = (path, structure, lazy)
+                else:
+                    directories[name] = structure
+
+        removed = [name for name in self.paths if name not in files]
+        added = [name for name in files if name not in self.paths]
+        changed = [name for name in files if name in self.stats and
+                   self.stat(files[name][0]) != self.stats[name]]
+        affected = set(removed + added + changed)
+        # folders listing an added or removed file
+        structures = [self.structures[name] for name in removed] + [files[name][1] for name in added]
+        affected.update(MAGIC_SPLIT_NAME.join(structure[:-1]) for structure in structures
+                        if len(structure) > 1)
+
+        for name in removed:
+            self.file_tree.remove(self.structures[name])
+            if name in self.dependency_graph.types:
+                self.dependency_graph.remove_node(name)
+            for mapping in (self.paths, self.structures, self.pending, self.stats, self.digests):
+                mapping.pop(name, None)
+        for name in added + changed:
+            path, structure, lazy = files[name]
+            self.defer_file(name, path, structure)
+        self.load_files([name for name in added if not files[name][2]] + changed)
+
+        for name in list(self.directories):
+            if name not in directories:
+                self.dependency_graph.remove_node(name)
+                del self.directories[name]
+                affected.add(name)
+        for name, structure in directories.items():
+            if name in affected or name not in self.directories:
+                self.register_directory(name, None, structure)
+                affected.add(name)
+        if self.cache is not None:
+            self.cache.save()
+
+        for name in list(affected):
+            affected.update(self.dependency_graph.get_dependents(name))
+        rebuild = [name for name in affected if name in self.types]
+        reloads = []
+        for name in affected:
+            self.types.pop(name, None)
+            self.indices.pop(name, None)
+        for name in rebuild:
+            if name not in self.dependency_graph.types:
+                logger.warning("Type %s was removed", name)
+                continue
+            try:
+                self.build(name)
+            except Exception:
+                logger.exception("Rebuilding %s failed", name)
+                continue
+            for template in list(self.templates.get(name, ())):
+                reloads.append((template, self.get(name), self.path_index(name)))
+        return affected, reloads
 
     def register_type(self, name, type):
         self.types[name] = type
@@ -248,27 +793,96 @@ class TypeFactory(object):
         self.dependency_graph.add(name, cfg, dependencies)
 
     def build(self, name):
-        build_order = self.dependency_graph.get_dep_order(name)
-        for type_name in build_order:
-            node = self.dependency_graph.get_node(name)
+        with self.lock:
+            if name in self.types:
+                # built by another thread
+                return self.types[name]
+            return self._build(name)
+
+    def _build(self, name):
+        self.load(name)
+        if self.cache is not None:
+            self.cache.save()
+            if self.load_cached(name):
+                return self.types[name]
+        # the subtypes of folders are built once they are chosen
+        build_order = list(self.dependency_graph.get_dep_order(name, folders=False))
+        # dependencies first, the type itself last
+        for type_name in build_order + [name]:
+            node = self.dependency_graph.get_node(type_name)
             if node.name in self.types:
                 continue
+            if self.cache is not None and self.load_cached(node.name):
+                continue
             self.types[node.name] = self.build_from_node(node)
+            if self.cache is not None:
+                self.cache.store_type(self.type_key(node.name), self.types[node.name])
         return self.types[name]
 
+    def load_cached(self, name):
+        with prof.phase("cache_load", name):
+            typ = self.cache.load_type(self.type_key(name))
+        if typ is None:
+            return False
+        prof.count("cache_hits")
+        self.bind(typ)
+        self.types[name] = typ
+        return True
+
+    def bind(self, typ):
+        """Lets the OneOfTypes of a type loaded from the cache build their subtypes"""
+        stack = [typ]
+        seen = set()
+        while stack:
+            parser = stack.pop()
+            if id(parser) in seen:
+                continue
+            seen.add(id(parser))
+            if isinstance(parser, CompositeType):
+                stack.extend(attribute.parser for attribute in parser.attributes.values())
+            elif isinstance(parser, OneOfType):
+                parser.subtypes.build = self.schema
+
+    def type_key(self, name):
+        """Digest of all templates the type is built from, subtypes of folders are stored by themselves"""
+        names = list(self.dependency_graph.get_dep_order(name, folders=False)) + [name]
+        key = hashlib.sha1(str(CACHE_VERSION).encode())
+        for type_name in sorted(names):
+            node = self.dependency_graph.get_node(type_name)
+            if type_name in self.digests:
+                content = self.digests[type_name]
+            elif node.cfg is None:
+                # base type or folder
+                content = ",".join(sorted(node.dependency_list))
+            else:
+                # registered without a file
+                content = json.dumps(node.cfg, sort_keys=True)
+            key.update("{}:{};".format(type_name, content).encode())
+        return key.hexdigest()
+
     def build_type(self, type, name, cfg):
         if type == "oneof":
             parser = OneOf(name)
             parser.add_options(cfg.pop('options'))
         elif type == "datatype":
-            # this type exists because of dependency analysis
-            parser = self.get(cfg.pop('dtype'))
+            dtype = cfg.pop('dtype')
+            match = LIST_PATTERN.match(dtype)
+            if match is not None:
+                parser = ListType(name, self.element(name, match.group(1)))
+            else:
+                # this type exists because of dependency analysis
+                parser = self.schema(dtype)
+        elif type == "array":
+            element = self.element(name, cfg.pop('dtype'))
+            if not isinstance(element, tuple(NUMERIC_KINDS)):
+                raise ValueError("Error in Template {}: arrays hold int, float or bool, not {}".format(
+                    name, element.name))
+            parser = ListType(name, element, cfg.pop('shape', None), cfg.pop('min', None),
+                              cfg.pop('max', None), cfg.pop('ndarray', False))
         elif type == "one_of_type":
             # Folder
-            subtypes = {}
-            for dep in cfg['subtypes']:
-                subtypes[dep] = self.get(dep)
-            parser = OneOfType(name, subtypes)
+            # only the chosen subtypes are built
+            parser = OneOfType(name, Subtypes(sorted(cfg['subtypes']), self.schema))
         elif type == "composite_type":
             parser = CompositeType(name)
             for key, values in cfg.items():
@@ -285,31 +899,67 @@ class TypeFactory(object):
             raise ValueError("Error in Template {}: unknown type {}".format(name, type))
         return parser
 
+    def element(self, name, dtype):
+        """Returns the schema of the items of a list"""
+        element = self.schema(dtype)
+        if element.nested:
+            raise ValueError("Error in Template {}: lists of {} are not supported".format(name, dtype))
+        return element
+
     def build_from_node(self, node):
-        cfg = node.cfg
-        if cfg is None:
-            cfg = {'subtypes': node.dependency_list}
-            type_name = "one_of_type"
-        else:
-            type_name = "composite_type"
-        return self.build_type(type_name, node.name, cfg)
+        with prof.phase("build_type", node.name):
+            # building consumes the cfg, the node keeps the original
+            cfg = copy.deepcopy(node.cfg)
+            prof.count("deep_copies")
+            if cfg is None:
+                cfg = {'subtypes': node.dependency_list}
+                type_name = "one_of_type"
+            else:
+                type_name = "composite_type"
+            return self.build_type(type_name, node.name, cfg)
 
-    def get(self, name):
-        import copy
-        if name not in self.types:
-            typ = self.build(name)
-        else:
-            typ = self.types[name]
+    def schema(self, name):
+        """Returns the shared type, which must not be filled"""
+        typ = self.types.get(name)
+        if typ is None:
+            return self.build(name)
+        return typ
 
-        return copy.deepcopy(typ)
+    def get(self, name):
+        schema = self.schema(name)
+        with prof.phase("instantiate", name):
+            return schema.instantiate()
+
+    def path_index(self, name):
+        index = self.indices.get(name)
+        if index is None:
+            with self.lock:
+                if name not in self.indices:
+                    self.indices[name] = PathIndex(self.schema(name))
+                index = self.indices[name]
+        return index
+
+    async def abuild_template(self, name):
+        """build_template reading and building in the executor of aio"""
+        from . import aio
+        async with aio.lock(self):
+            await self.aload(name)
+            return await aio.run(self.build_template, name)
 
     def build_template(self, name):
-        return ConfigTemplate(name, self.get(name))
+        with prof.phase("build_template", name):
+            template = ConfigTemplate(name, self.get(name), self.path_index(name))
+        with self.lock:
+            self.templates.setdefault(name, weakref.WeakSet()).add(template)
+        return template
 
     @staticmethod
     def extract_dependcies(cfg):
         dependencies = set()
         for key, value in cfg.items():
             if value['type'] == 'datatype':
+                match = LIST_PATTERN.match(value['dtype'])
+                dependencies.add(value['dtype'] if match is None else match.group(1))
+            elif value['type'] == 'array':
                 dependencies.add(value['dtype'])
         return dependencies
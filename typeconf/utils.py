@@ -1,4 +1,7 @@
+import importlib.util
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 SUPPORTED_FILETYPES = ['.yaml', '.json']
 DEFAULT_DESCRIPTOR_PATH = 'protos'
 IGNORE_FOLDERS = ["__pycache__", './']
@@ -18,48 +21,253 @@ def dot2dict(dotstring, value):
     return base_dic
 
 
+def parse_sweep(value, dimensions=0):
+    """
+    Parses the values of a sweep, either a list [a,b,c] or range(start,stop[,step]).
+    A list value is one level deeper than the list itself: for a list
+    attribute [1,2] is a single value and [[1,2],[3]] sweeps two lists.
+
+    Args:
+        dimensions: number of nested lists the value at the path holds, 0 for no list
+
+    Returns:
+        A list of strings or a range, None if value is not a sweep
+    """
+    value = value.strip()
+    if value.startswith('[') and value.endswith(']'):
+        if dimensions == 0:
+            return [v.strip() for v in value[1:-1].split(',')]
+        values = json.loads(value)
+        if list_depth(values) <= dimensions:
+            return None
+        # read as JSON again like all list values from the command line
+        return [json.dumps(v) for v in values]
+    if value.startswith('range(') and value.endswith(')'):
+        args = [int(v) for v in value[len('range('):-1].split(',')]
+        return range(*args)
+    return None
+
+
+def list_depth(value):
+    """Returns the number of nested lists, following the first items"""
+    depth = 0
+    while isinstance(value, list):
+        depth += 1
+        if len(value) == 0:
+            break
+        value = value[0]
+    return depth
+
+
+def iter_product(axes):
+    """
+    Like itertools.product for sequences, but without copying them,
+    so ranges are never materialized.
+    """
+    if any(len(axis) == 0 for axis in axes):
+        return
+    indices = [0] * len(axes)
+    while True:
+        yield tuple(axis[i] for axis, i in zip(axes, indices))
+        # advance the last axis first
+        for pos in reversed(range(len(axes))):
+            indices[pos] += 1
+            if indices[pos] < len(axes[pos]):
+                break
+            indices[pos] = 0
+        else:
+            return
+
+
+def replace_path(cfg, levels, value, choices=()):
+    """
+    Returns a copy of cfg with the value at levels replaced.
+    Only the dicts along the path are copied, everything else is shared.
+
+    Args:
+        choices: positions of levels choosing one subtype,
+                 the other keys at this level are dropped
+    """
+    return _replace_path(cfg, levels, value, set(choices), 0)
+
+
+def _replace_path(cfg, levels, value, choices, pos):
+    key = levels[pos]
+    if pos in choices:
+        cfg = {key: cfg[key]} if key in cfg else {}
+    else:
+        cfg = dict(cfg)
+    if pos == len(levels) - 1:
+        cfg[key] = value
+    else:
+        sub = cfg.get(key)
+        cfg[key] = _replace_path(sub if isinstance(sub, dict) else {}, levels, value, choices, pos + 1)
+    return cfg
+
+
 def discover(basepath=DEFAULT_DESCRIPTOR_PATH, structure=[]):
     """
     Recursively check for supported files
     we need to first build the ones without dependencies, which are in the subfolders,
     descriptors on the same level cannot depend on each other
     we do this by seeing the folder structure hierachically
+    Entries are returned sorted by name.
     TODO
     first subfolders before files
     files in subfolders before subfolder
     """
-    for f in os.listdir(basepath):
+    with os.scandir(basepath) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+
+    for entry in entries:
+        f = entry.name
         if f in IGNORE_FOLDERS:
             continue
 
         path = os.path.join(basepath, f)
 
-        if os.path.isdir(path):
+        if entry.is_dir():
             # return subfiles before parent folder!
             sub_structure = structure.copy()
             sub_structure.append(f)
             for returnvalue in discover(path, sub_structure):
                 yield returnvalue
             yield path, sub_structure, DIR_ENUM
-        elif os.path.isfile(path):
+        elif entry.is_file():
             for ftype in SUPPORTED_FILETYPES:
                 if f.endswith(ftype):
                     sub_structure = structure.copy()
-                    sub_structure.append(f.rstrip(ftype))
+                    sub_structure.append(f[:-len(ftype)])
                     yield path, sub_structure, FILE_ENUM
                     break
         else:
             raise RuntimeError("Not supported case TODO")
 
 
+def register_format(extension, loader, dumper=None):
+    """
+    Makes files with the extension, e.g. '.toml', available as templates and configs.
+
+    Args:
+        loader: loader(path) returns the content of the file
+        dumper: dumper(path, cfg) writes cfg, see write_file
+    """
+    LOADERS[extension] = loader
+    if dumper is not None:
+        DUMPERS[extension] = dumper
+    if extension not in SUPPORTED_FILETYPES:
+        SUPPORTED_FILETYPES.append(extension)
+
+
 def read_file(path):
-    if path.endswith('.yaml'):
-        return read_from_yaml(path)
+    loader = LOADERS.get(os.path.splitext(path)[1])
+    if loader is None:
+        raise ValueError(f"Unknown File Ending {path}")
+    return loader(path)
 
-    raise ValueError(f"Unknown File Ending {path}")
+
+def write_file(path, cfg):
+    dumper = DUMPERS.get(os.path.splitext(path)[1])
+    if dumper is None:
+        raise ValueError(f"Unknown File Ending {path}")
+    dumper(path, cfg)
+
+
+def read_files(paths, workers=None, processes=False):
+    """
+    Reads the files concurrently.
+
+    Args:
+        workers: size of the pool, None to read sequentially
+        processes: use a process instead of a thread pool
+
+    Returns:
+        The contents in the order of paths
+    """
+    if workers is None or len(paths) < 2:
+        return [read_file(path) for path in paths]
+    if processes:
+        with ProcessPoolExecutor(workers) as pool:
+            chunksize = max(1, len(paths) // (4 * workers))
+            return list(pool.map(read_file, paths, chunksize=chunksize))
+    with ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(read_file, paths))
+
+
+def yaml_loader():
+    """The libyaml based loader if it is available"""
+    import yaml
+    return getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 
 
 def read_from_yaml(path):
     import yaml
     with open(path, 'r') as f:
-        return yaml.load(f, yaml.SafeLoader)
+        return yaml.load(f, yaml_loader())
+
+
+def write_to_yaml(path, cfg):
+    import yaml
+    with open(path, 'w') as f:
+        yaml.safe_dump(cfg, f)
+
+
+def json_loads():
+    """orjson.loads if it is installed, otherwise json.loads"""
+    try:
+        import orjson
+        return orjson.loads
+    except ImportError:
+        import json
+        return json.loads
+
+
+def read_from_json(path):
+    # both backends accept bytes
+    with open(path, 'rb') as f:
+        return json_loads()(f.read())
+
+
+def write_to_json(path, cfg):
+    import json
+    with open(path, 'w') as f:
+        json.dump(cfg, f, indent=4)
+
+
+def read_from_msgpack(path):
+    import msgpack
+    with open(path, 'rb') as f:
+        return msgpack.unpackb(f.read(), raw=False)
+
+
+def write_to_msgpack(path, cfg):
+    import msgpack
+    with open(path, 'wb') as f:
+        f.write(msgpack.packb(cfg, use_bin_type=True))
+
+
+def read_from_marshal(path):
+    """
+    Only for trusted files, the format depends on the python version.
+    Not registered by default:
+        utils.register_format('.marshal', utils.read_from_marshal, utils.write_to_marshal)
+    """
+    import marshal
+    with open(path, 'rb') as f:
+        return marshal.loads(f.read())
+
+
+def write_to_marshal(path, cfg):
+    import marshal
+    with open(path, 'wb') as f:
+        marshal.dump(cfg, f)
+
+
+# extension -> function reading and writing a file, see register_format
+LOADERS = {}
+DUMPERS = {}
+register_format('.yaml', read_from_yaml, write_to_yaml)
+register_format('.json', read_from_json, write_to_json)
+# only with the optional dependency, otherwise a stray file would fail discovery
+if importlib.util.find_spec('msgpack') is not None:
+    register_format('.msgpack', read_from_msgpack, write_to_msgpack)
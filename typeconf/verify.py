@@ -0,0 +1,133 @@
+"""
+Verification of many existing configs against a template.
+
+    typeconf-verify class1 'configs/**/*.yaml' -t templates -w 8 -o summary.json
+"""
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from argparse import ArgumentParser
+
+from . import profiling
+from . import utils as u
+from .type_factory import TypeFactory
+
+logger = logging.getLogger()
+
+# template of the worker process, see init_worker
+_template = None
+
+
+def find_configs(patterns):
+    """
+    Args:
+        patterns: directories, searched recursively, or glob patterns
+
+    Returns:
+        The sorted paths of all supported files
+    """
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, files in os.walk(pattern):
+                paths.update(os.path.join(root, f) for f in files
+                             if any(f.endswith(ftype) for ftype in u.SUPPORTED_FILETYPES))
+        else:
+            paths.update(glob.glob(pattern, recursive=True))
+    return sorted(paths)
+
+
+def init_worker(directories, name):
+    """Builds the template in the worker, templates cannot be pickled"""
+    global _template
+    factory = TypeFactory(*directories, lazy=True)
+    _template = factory.build_template(name)
+    _template.compile()
+
+
+def check(path):
+    try:
+        _template.validate(u.read_file(path))
+    except Exception as e:
+        return {'path': path, 'valid': False, 'error': "{}: {}".format(type(e).__name__, e)}
+    return {'path': path, 'valid': True, 'error': None}
+
+
+def verify(directories, name, paths, workers=None, chunksize=16, context=None):
+    """
+    Validates the configs in paths against the template name.
+    Every worker builds the template once.
+
+    Args:
+        directories: search directories of the templates
+        workers: number of processes, None validates in this process
+        context: multiprocessing context of the workers, e.g. get_context("spawn")
+
+    Returns:
+        Generator of one result per path, in the order of paths
+    """
+    directories = list(directories)
+    if workers is None:
+        init_worker(directories, name)
+        yield from map(check, paths)
+        return
+    if context is None:
+        context = multiprocessing
+    with context.Pool(workers, init_worker, (directories, name)) as pool:
+        yield from pool.imap(check, paths, chunksize)
+
+
+def summarize(name, results):
+    invalid = [r for r in results if not r['valid']]
+    return {
+        'template': name,
+        'total': len(results),
+        'valid': len(results) - len(invalid),
+        'invalid': len(invalid),
+        'results': results,
+    }
+
+
+def main(args=None):
+    parser = ArgumentParser(description="Verify configs against a template")
+    parser.add_argument('template', help="name of the template")
+    parser.add_argument('configs', nargs='+', help="config files, directories or glob patterns")
+    parser.add_argument('-t', '--templates', action='append', required=True,
+                        help="search directory of the templates, can be repeated")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="number of processes, by default configs are checked in this process")
+    parser.add_argument('-o', '--output', help="write a json summary to this file")
+    parser.add_argument('-q', '--quiet', action='store_true', help="only print invalid configs")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="write the timings of all phases, a Chrome trace for .json files, - prints them")
+    args = parser.parse_args(args)
+    if args.profile is None:
+        return run(args)
+    with profiling.record() as recorder:
+        status = run(args)
+    recorder.dump(args.profile)
+    return status
+
+
+def run(args):
+    results = []
+    for result in verify(args.templates, args.template, find_configs(args.configs), args.workers):
+        results.append(result)
+        if not result['valid']:
+            print("FAIL {}: {}".format(result['path'], result['error']))
+        elif not args.quiet:
+            print("OK   {}".format(result['path']))
+
+    summary = summarize(args.template, results)
+    print("{} of {} configs are valid".format(summary['valid'], summary['total']))
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=4)
+    return 0 if summary['invalid'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Polls the search directories of a TypeFactory for changed templates"""
+import logging
+import threading
+
+logger = logging.getLogger()
+
+
+class Watcher(object):
+    """
+    Calls TypeFactory.refresh every interval seconds in a background thread.
+
+        with Watcher(factory, interval=2.0):
+            serve()
+    """
+    def __init__(self, factory, interval=1.0, callback=None):
+        """
+        Args:
+            callback: called with the names of the affected types
+                      whenever templates changed
+        """
+        self.factory = factory
+        self.interval = interval
+        self.callback = callback
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def poll(self):
+        affected = self.factory.refresh()
+        if len(affected) > 0:
+            logger.info("Reloaded templates: %s", ", ".join(sorted(affected)))
+            if self.callback is not None:
+                self.callback(affected)
+        return affected
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Refreshing the templates failed")
+
+    def start(self):
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name="typeconf-watcher", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()